@@ -0,0 +1,219 @@
+"""
+Download catalog product images and make them render-ready.
+
+For every product in the catalog this makes sure that
+
+- `data/<product_id>.jpg` exists. It is downloaded from the record's
+  `website_details.image_url` when there is one, or else kept as placed by hand.
+- the downscaled JPEG the render stage sends to the image model exists in
+  `data/variants/<edge>q<quality>/`.
+
+Downloads run concurrently over one pooled HTTP client. Repeat runs send
+conditional GETs (If-None-Match / If-Modified-Since), so unchanged images
+cost one 304 each. Originals and variants are stored once per content hash
+under `data/objects/`, and the per-product paths are hard links to them.
+Products left without an image are listed in the missing-asset report.
+
+    python -m backend.app.asset_sync [--concurrency 16] [--report missing.json]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from PIL import Image
+
+from backend.app import config
+from backend.app.assets import encode_image, variant_dir
+from backend.app.catalog import catalog
+
+MANIFEST_NAME = "assets.json"
+
+
+def _replace_with_link(source: Path, target: Path):
+    """Point target at source's content, atomically; copies where hard links are unsupported"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+class AssetStore:
+    """Content-addressed originals and variants under <directory>/objects"""
+
+    def __init__(self, directory: Path, max_edge: int, quality: int):
+        self.directory = Path(directory)
+        self.max_edge = max_edge
+        self.quality = quality
+        self.objects = self.directory / "objects"
+        self.variants = variant_dir(self.directory, max_edge, quality)
+
+    def product_path(self, product_id: str) -> Path:
+        return self.directory / f"{product_id}.jpg"
+
+    def object_path(self, sha256: str, suffix: str = "") -> Path:
+        return self.objects / sha256[:2] / f"{sha256}{suffix}.jpg"
+
+    def put(self, data: bytes) -> str:
+        """Store data once under its hash"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return sha256
+
+    def adopt(self, product_id: str) -> str:
+        """Store a hand-placed product image and turn it into a link to its object"""
+        path = self.product_path(product_id)
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        if not self.object_path(sha256).exists():
+            _replace_with_link(path, self.object_path(sha256))
+        return sha256
+
+    def publish(self, product_id: str, sha256: str):
+        """Link the product paths to the original and its pre-encoded variant"""
+        original = self.object_path(sha256)
+        variant = self.object_path(sha256, f"-{self.max_edge}q{self.quality}")
+        if not variant.exists():
+            tmp = variant.with_name(f".{variant.name}.tmp")
+            tmp.write_bytes(encode_image(original, self.max_edge, self.quality))
+            os.replace(tmp, variant)
+
+        for source, target in ((original, self.product_path(product_id)), (variant, self.variants / f"{product_id}.jpg")):
+            if not (target.exists() and os.path.samefile(source, target)):
+                _replace_with_link(source, target)
+
+
+def image_url(record: Dict[str, Any]) -> Optional[str]:
+    return record.get("website_details", {}).get("image_url") or None
+
+
+class AssetSync:
+    def __init__(self, store: AssetStore, manifest_path: Path, concurrency: int = 16, timeout: float = 30.0):
+        self.store = store
+        self.manifest_path = Path(manifest_path)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        try:
+            self.manifest: Dict[str, Dict[str, Any]] = json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {}
+        self.counts = {"downloaded": 0, "not_modified": 0, "local": 0, "failed": 0, "missing": 0}
+        self.missing: List[Dict[str, Any]] = []
+
+    def _conditional_headers(self, product_id: str, url: str) -> Dict[str, str]:
+        entry = self.manifest.get(product_id)
+        if not entry or entry.get("url") != url or not self.store.product_path(product_id).exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    async def _download(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, product_id: str, url: str):
+        async with semaphore:
+            response = await client.get(url, headers=self._conditional_headers(product_id, url))
+
+        if response.status_code == 304:
+            self.counts["not_modified"] += 1
+            sha256 = self.manifest[product_id]["sha256"]
+        else:
+            response.raise_for_status()
+            data = response.content
+            # Reject error pages and truncated files before they replace a good image
+            await asyncio.to_thread(lambda: Image.open(BytesIO(data)).verify())
+            sha256 = await asyncio.to_thread(self.store.put, data)
+            self.counts["downloaded"] += 1
+            self.manifest[product_id] = {
+                "url": url,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "sha256": sha256,
+            }
+        await asyncio.to_thread(self.store.publish, product_id, sha256)
+
+    async def _sync_one(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, record: Dict[str, Any]):
+        product_id = record["product_id"]
+        url = image_url(record)
+        has_file = self.store.product_path(product_id).exists()
+
+        if url:
+            try:
+                await self._download(client, semaphore, product_id, url)
+                return
+            except Exception as e:
+                self.counts["failed"] += 1
+                print(f"Warning: could not download the image of {product_id} from {url}: {e}")
+                if not has_file:
+                    self._report_missing(product_id, url, f"download failed: {e}")
+                    return
+
+        if not has_file:
+            self._report_missing(product_id, url, "no image_url and no file")
+            return
+        # Hand-placed image, or the previous download when this one failed
+        sha256 = await asyncio.to_thread(self.store.adopt, product_id)
+        await asyncio.to_thread(self.store.publish, product_id, sha256)
+        self.counts["local"] += 1
+
+    def _report_missing(self, product_id: str, url: Optional[str], reason: str):
+        self.counts["missing"] += 1
+        self.missing.append({
+            "product_id": product_id,
+            "category": catalog.category_of(product_id),
+            "image_url": url,
+            "reason": reason,
+        })
+
+    async def run(self, records: List[Dict[str, Any]]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True) as client:
+            await asyncio.gather(*(self._sync_one(client, semaphore, record) for record in records))
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f".{self.manifest_path.name}.tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+        os.replace(tmp, self.manifest_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download catalog product images and pre-encode them for rendering")
+    parser.add_argument("--data-dir", type=Path, default=config.data_dir)
+    parser.add_argument("--concurrency", type=int, default=16, help="downloads in flight at once")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per download")
+    parser.add_argument("--report", type=Path, help="write the missing-asset report to this JSON file")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 if any product has no image")
+    args = parser.parse_args()
+
+    catalog.load()
+    records = [record for records in catalog.inventory().values() for record in records]
+    store = AssetStore(args.data_dir, config.asset_max_edge, config.asset_jpeg_quality)
+    sync = AssetSync(store, args.data_dir / MANIFEST_NAME, args.concurrency, args.timeout)
+
+    started = time.monotonic()
+    asyncio.run(sync.run(records))
+    print(f"Synced {len(records)} product images in {time.monotonic() - started:.1f}s: "
+          + ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in sync.counts.items()))
+    for entry in sync.missing:
+        print(f"  missing: {entry['product_id']} ({entry['reason']})")
+    if args.report:
+        args.report.write_text(json.dumps(sync.missing, indent=2))
+    if args.strict and sync.missing:
+        raise SystemExit(1)
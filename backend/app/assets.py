@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, Optional
+
+from PIL import Image
+
+from backend.app import config
+
+
+def encode_image(path: Path, max_edge: int, quality: int) -> bytes:
+    """The image at path downscaled to fit max_edge and encoded as JPEG"""
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def variant_dir(directory: Path, max_edge: int, quality: int) -> Path:
+    """Where asset_sync puts the pre-encoded images for these settings"""
+    return Path(directory) / "variants" / f"{max_edge}q{quality}"
+
+
+class ProductImageCache:
+    """
+    Memory-bounded LRU of catalog product images, ready to send to the image
+    model: decoded once, downscaled to max_edge and re-encoded as JPEG.
+    Variants pre-encoded by asset_sync are read as they are.
+    """
+
+    def __init__(self, directory: Path, max_edge: int = 1024, max_bytes: int = 64 * 1024 * 1024, quality: int = 85):
+        self.directory = Path(directory)
+        self.max_edge = max_edge
+        self.max_bytes = max_bytes
+        self.quality = quality
+
+        self._images: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, product_id: str) -> Path:
+        return self.directory / f"{product_id}.jpg"
+
+    def encode(self, path: Path) -> bytes:
+        return encode_image(path, self.max_edge, self.quality)
+
+    def load(self, product_id: str) -> bytes:
+        variant = variant_dir(self.directory, self.max_edge, self.quality) / f"{product_id}.jpg"
+        try:
+            return variant.read_bytes()
+        except FileNotFoundError:
+            return self.encode(self.path_for(product_id))
+
+    def _store(self, product_id: str, data: bytes):
+        with self._lock:
+            if product_id in self._images:
+                return
+            self._images[product_id] = data
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, product_id: str) -> Optional[bytes]:
+        """Encoded JPEG bytes for the product, or None if it has no image"""
+        with self._lock:
+            data = self._images.get(product_id)
+            if data is not None:
+                self._images.move_to_end(product_id)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        try:
+            data = self.load(product_id)
+        except FileNotFoundError:
+            print(f"Warning: no image for product {product_id}")
+            return None
+
+        self._store(product_id, data)
+        return data
+
+    def warm(self, product_ids: Iterable[str]):
+        """Load images until the memory budget is full; meant to run at startup"""
+        loaded = 0
+        for product_id in product_ids:
+            if self._size >= self.max_bytes:
+                break
+            if product_id in self._images:
+                continue
+            try:
+                self._store(product_id, self.load(product_id))
+                loaded += 1
+            except Exception as e:
+                print(f"Warning: could not preload image for {product_id}: {e}")
+        print(f"Preloaded {loaded} product images ({self._size // 1024} KiB)")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "images": len(self._images),
+            "bytes": self._size,
+        }
+
+
+product_images = ProductImageCache(
+    config.data_dir,
+    config.asset_max_edge,
+    config.asset_cache_bytes,
+    config.asset_jpeg_quality,
+)
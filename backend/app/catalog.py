@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.app import config
+
+# Table layout of the compiled catalog built by scraping/ingest.py
+DATABASE_FORMAT = "1"
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower()
+
+
+class _Snapshot:
+    """Immutable set of records and indexes for one catalog version"""
+
+    def __init__(self, inventory: Dict[str, List[Dict[str, Any]]]):
+        self.inventory = inventory
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.category_of: Dict[str, str] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_style: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_room_type: Dict[str, List[Dict[str, Any]]] = {}
+
+        priced = []
+        for category, records in inventory.items():
+            self.by_category[category] = records
+            for record in records:
+                self.by_id[record["product_id"]] = record
+                self.category_of[record["product_id"]] = category
+                for style in record.get("category", {}).get("style", []):
+                    self.by_style.setdefault(_normalize(style), []).append(record)
+                for room_type in record.get("suitability_meta", {}).get("room_type", []):
+                    self.by_room_type.setdefault(_normalize(room_type), []).append(record)
+                priced.append((record.get("pricing", {}).get("price", 0), record["product_id"], record))
+
+        priced.sort(key=lambda entry: (entry[0], entry[1]))
+        self.prices = [entry[0] for entry in priced]
+        self.by_price = [entry[2] for entry in priced]
+
+
+class _FileState:
+    def __init__(self):
+        self.mtime_ns = None
+        self.sha256 = None
+        self.records: List[Dict[str, Any]] = []
+
+
+class Catalog:
+    """
+    Process-wide furniture catalog.
+
+    Category files are parsed once and indexed by product_id, category, style,
+    room_type and price. A file is re-read only when its mtime changes and
+    re-parsed only when its content hash changes. Every content change bumps
+    `version`; `fingerprint` is a hash of the file contents and stays stable
+    across restarts.
+
+    When the compiled catalog from scraping/ingest.py exists at `database`,
+    it replaces the category files: all records come from one query, and the
+    file is re-read only when its mtime and then its build fingerprint change.
+
+    Records are loaded on first use. In the app, start() re-checks the files
+    every `reload_interval` seconds from a background task, in a worker
+    thread, so requests never touch the filesystem.
+    """
+
+    def __init__(self, directory: Path, categories: List[str], reload_interval: float = 5.0,
+                 database: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.database = Path(database) if database else None
+        self.categories = [category.strip() for category in categories if category.strip()]
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._files: Dict[str, _FileState] = {category: _FileState() for category in self.categories}
+        self._database = _FileState()
+        self._snapshot = _Snapshot({category: [] for category in self.categories})
+        self._loaded = False
+        self._watch_task: Optional[asyncio.Task] = None
+
+        self.version = 0
+        self.fingerprint = ""
+
+    def path_for(self, category: str) -> Path:
+        return self.directory / f"{category}.json"
+
+    def load(self) -> bool:
+        """Check every category file now and rebuild the indexes if anything changed"""
+        with self._lock:
+            if self.database is not None and self.database.exists():
+                changed = self._check_database()
+            else:
+                changed = self._database.sha256 is not None
+                self._database = _FileState()
+                for category in self.categories:
+                    changed |= self._check_file(category)
+
+            if changed or not self._loaded:
+                self._rebuild()
+            self._loaded = True
+            return changed
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception as e:
+                print(f"Warning: could not reload the catalog: {e}")
+
+    def start(self):
+        """Reload changed catalog files in the background; needs a running event loop"""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(), name="catalog-reload")
+
+    async def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+
+    def _check_file(self, category: str) -> bool:
+        state = self._files[category]
+        path = self.path_for(category)
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            if state.mtime_ns == -1:
+                return False
+            print(f"Warning: {path} not found")
+            changed = state.sha256 is not None
+            state.mtime_ns, state.sha256, state.records = -1, None, []
+            return changed
+
+        if mtime_ns == state.mtime_ns:
+            return False
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        state.mtime_ns = mtime_ns
+
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if sha256 == state.sha256:
+            return False
+
+        try:
+            records = json.loads(raw)
+        except json.JSONDecodeError as e:
+            # Keep serving the previous content until the file is fixed
+            print(f"Warning: could not parse {path}: {e}")
+            return False
+
+        state.sha256 = sha256
+        state.records = records
+        return True
+
+    def _check_database(self) -> bool:
+        state = self._database
+        mtime_ns = os.stat(self.database).st_mtime_ns
+        if mtime_ns == state.mtime_ns:
+            return False
+
+        try:
+            with closing(sqlite3.connect(f"{self.database.resolve().as_uri()}?mode=ro", uri=True)) as db:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+                if meta.get("format") != DATABASE_FORMAT:
+                    print(f"Warning: {self.database} has format {meta.get('format')}, expected {DATABASE_FORMAT}")
+                    return False
+                state.mtime_ns = mtime_ns
+                if meta["fingerprint"] == state.sha256:
+                    return False
+                rows = db.execute("SELECT category, record FROM products ORDER BY product_id").fetchall()
+        except sqlite3.Error as e:
+            # Keep serving the previous content; the file may be mid-build
+            print(f"Warning: could not read {self.database}: {e}")
+            return False
+
+        records: Dict[str, List[Dict[str, Any]]] = {category: [] for category in self.categories}
+        for category, record in rows:
+            if category in records:
+                records[category].append(json.loads(record))
+        state.sha256 = meta["fingerprint"]
+        for category in self.categories:
+            self._files[category] = _FileState()
+            self._files[category].records = records[category]
+        return True
+
+    def _rebuild(self):
+        inventory = {category: self._files[category].records for category in self.categories}
+        self._snapshot = _Snapshot(inventory)
+
+        if self._database.sha256 is not None:
+            self.fingerprint = self._database.sha256
+        else:
+            digest = hashlib.sha256()
+            for category in self.categories:
+                digest.update(f"{category}:{self._files[category].sha256 or ''};".encode())
+            self.fingerprint = digest.hexdigest()[:16]
+        self.version += 1
+        print(f"Catalog v{self.version} loaded: {len(self._snapshot.by_id)} products ({self.fingerprint})")
+
+    def _current(self) -> _Snapshot:
+        if not self._loaded:
+            self.load()
+        return self._snapshot
+
+    def inventory(self) -> Dict[str, List[Dict[str, Any]]]:
+        """All records grouped by category"""
+        return self._current().inventory
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self._current().by_id.get(product_id)
+
+    def category_of(self, product_id: str) -> Optional[str]:
+        return self._current().category_of.get(product_id)
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        return self._current().by_category.get(category, [])
+
+    def by_style(self, style: str) -> List[Dict[str, Any]]:
+        return self._current().by_style.get(_normalize(style), [])
+
+    def by_room_type(self, room_type: str) -> List[Dict[str, Any]]:
+        return self._current().by_room_type.get(_normalize(room_type), [])
+
+    def in_price_range(self, min_price: float = 0, max_price: float = float("inf")) -> List[Dict[str, Any]]:
+        """Records with min_price <= price <= max_price, cheapest first"""
+        snapshot = self._current()
+        lo = bisect.bisect_left(snapshot.prices, min_price)
+        hi = bisect.bisect_right(snapshot.prices, max_price)
+        return snapshot.by_price[lo:hi]
+
+    def __len__(self):
+        return len(self._current().by_id)
+
+
+catalog = Catalog(config.scraping_dir, config.catalog_categories, config.catalog_reload_interval, config.catalog_database)
@@ -9,3 +9,111 @@ load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 runware_api_key = os.getenv("RUNWARE_API_KEY")
 google_api_key = os.getenv("GOOGLE_API_KEY")
+
+image_model = os.getenv("IMAGE_MODEL", "gemini-2.5-flash-image-preview")
+
+# Repository layout
+project_root = Path(os.getenv("PROJECT_ROOT", Path(__file__).resolve().parents[2]))
+scraping_dir = Path(os.getenv("SCRAPING_DIR", project_root / "scraping"))
+data_dir = Path(os.getenv("DATA_DIR", project_root / "data"))
+
+# Furniture catalog
+catalog_categories = os.getenv("CATALOG_CATEGORIES", "sofas,lamps,armchairs").split(",")
+catalog_reload_interval = float(os.getenv("CATALOG_RELOAD_INTERVAL", "5"))
+# Compiled catalog from scraping/ingest.py; used instead of the category files when it exists
+catalog_database = Path(os.getenv("CATALOG_DATABASE", scraping_dir / "catalog.sqlite"))
+
+# Candidate items per category sent to the selection model
+shortlist_top_k = int(os.getenv("SHORTLIST_TOP_K", "8"))
+# Estimated prompt tokens for the selection call; lower ranked candidates are dropped to fit
+selection_prompt_max_tokens = int(os.getenv("SELECTION_PROMPT_MAX_TOKENS", "4000"))
+
+# Local semantic index (python -m backend.app.vector_index)
+vector_index_path = Path(os.getenv("VECTOR_INDEX_PATH", scraping_dir / "catalog_index"))
+embedding_model = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+semantic_top_k = int(os.getenv("SEMANTIC_TOP_K", "50"))
+semantic_weight = float(os.getenv("SEMANTIC_WEIGHT", "4"))
+
+# "llm" asks gpt-4o and repairs over-budget picks, "solver" picks items locally
+selection_mode = os.getenv("SELECTION_MODE", "llm")
+
+# Persistent caches
+cache_dir = Path(os.getenv("CACHE_DIR", project_root / ".cache"))
+selection_cache_size = int(os.getenv("SELECTION_CACHE_SIZE", "1024"))
+selection_cache_ttl = float(os.getenv("SELECTION_CACHE_TTL", str(7 * 24 * 3600)))
+selection_cache_budget_step = float(os.getenv("SELECTION_CACHE_BUDGET_STEP", "50"))
+
+# Uploaded room photos and generated images
+input_dir = Path(os.getenv("INPUT_DIR", project_root / "input"))
+results_dir = Path(os.getenv("RESULTS_DIR", project_root / "results"))
+results_quality = int(os.getenv("RESULTS_QUALITY", "82"))
+results_avif_quality = int(os.getenv("RESULTS_AVIF_QUALITY", "60"))
+results_thumbnail_edge = int(os.getenv("RESULTS_THUMBNAIL_EDGE", "320"))
+
+# Job scheduler
+job_workers = int(os.getenv("JOB_WORKERS", "64"))
+job_queue_size = int(os.getenv("JOB_QUEUE_SIZE", "256"))
+job_duration_estimate = float(os.getenv("JOB_DURATION_ESTIMATE", "30"))
+
+# Job store: "memory" or "sqlite" (durable, survives restarts)
+job_store = os.getenv("JOB_STORE", "memory")
+job_store_path = Path(os.getenv("JOB_STORE_PATH", cache_dir / "jobs.sqlite3"))
+job_store_max_jobs = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))
+job_store_max_age = float(os.getenv("JOB_STORE_MAX_AGE", str(24 * 3600)))
+
+# Alternative provider endpoints, e.g. the local stubs in backend/benchmarks
+openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+genai_base_url = os.getenv("GENAI_BASE_URL") or None
+
+# Shared HTTP connection pools for the OpenAI and Gemini clients
+provider_http2 = os.getenv("PROVIDER_HTTP2", "1") == "1"
+provider_max_connections = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "200"))
+provider_max_keepalive = int(os.getenv("PROVIDER_MAX_KEEPALIVE", "50"))
+provider_keepalive_expiry = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60"))
+provider_timeout = float(os.getenv("PROVIDER_TIMEOUT", "120"))
+provider_connect_timeout = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+
+# Concurrent calls allowed per provider across all jobs, to stay under rate limits
+openai_concurrency = int(os.getenv("OPENAI_CONCURRENCY", "16"))
+genai_concurrency = int(os.getenv("GENAI_CONCURRENCY", "8"))
+
+# Provider call deadlines (whole call, including retries) and per-attempt
+# timeouts, retry backoff, hedging and circuit breaking (see resilience.py)
+openai_deadline = float(os.getenv("OPENAI_DEADLINE", "90"))
+openai_attempt_timeout = float(os.getenv("OPENAI_ATTEMPT_TIMEOUT", "45"))
+openai_hedge = os.getenv("OPENAI_HEDGE", "0") == "1"
+genai_deadline = float(os.getenv("GENAI_DEADLINE", "240"))
+genai_attempt_timeout = float(os.getenv("GENAI_ATTEMPT_TIMEOUT", "120"))
+genai_hedge = os.getenv("GENAI_HEDGE", "0") == "1"
+provider_max_attempts = int(os.getenv("PROVIDER_MAX_ATTEMPTS", "3"))
+provider_retry_base_delay = float(os.getenv("PROVIDER_RETRY_BASE_DELAY", "0.5"))
+provider_retry_max_delay = float(os.getenv("PROVIDER_RETRY_MAX_DELAY", "8"))
+circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+circuit_reset_timeout = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# USD prices for the cost estimate on /metrics: gpt-4o per million tokens,
+# Gemini per generated image
+openai_input_price = float(os.getenv("OPENAI_INPUT_PRICE", "2.5"))
+openai_cached_input_price = float(os.getenv("OPENAI_CACHED_INPUT_PRICE", "1.25"))
+openai_output_price = float(os.getenv("OPENAI_OUTPUT_PRICE", "10"))
+genai_image_price = float(os.getenv("GENAI_IMAGE_PRICE", "0.039"))
+
+# Most variants a single /jobs/generate-batch request may ask for
+batch_max_variants = int(os.getenv("BATCH_MAX_VARIANTS", "8"))
+
+# Background provider reachability checks behind /health/ready
+health_check_interval = float(os.getenv("HEALTH_CHECK_INTERVAL", "30"))
+health_check_timeout = float(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
+
+# Seconds between keep-alive comments on /jobs/events streams
+sse_keepalive_interval = float(os.getenv("SSE_KEEPALIVE_INTERVAL", "15"))
+
+# Product images sent to the image model
+asset_max_edge = int(os.getenv("ASSET_MAX_EDGE", "1024"))
+asset_cache_bytes = int(os.getenv("ASSET_CACHE_BYTES", str(64 * 1024 * 1024)))
+asset_jpeg_quality = int(os.getenv("ASSET_JPEG_QUALITY", "85"))
+
+# Uploaded room photos are capped, then EXIF-rotated, downscaled and re-encoded
+max_upload_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+room_image_max_edge = int(os.getenv("ROOM_IMAGE_MAX_EDGE", "1536"))
+room_image_quality = int(os.getenv("ROOM_IMAGE_QUALITY", "90"))
@@ -0,0 +1,106 @@
+"""
+Planning for follow-up edits of a finished job.
+
+An edit starts from the parent job's selection and generated image. If the
+edit text names one furniture category, only that item is swapped for the
+best matching catalog alternative; otherwise the selection is kept and the
+parent image is re-rendered with the new wording. Neither case calls the
+selection model.
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from backend.app import config
+from backend.app.catalog import catalog
+from backend.app.shortlist import price_of, score_item, tokenize
+from backend.app.vector_index import semantic_scores
+
+
+class EditPlan:
+    def __init__(self, selected: List[Dict[str, Any]], category: Optional[str] = None,
+                 replaced: Optional[Dict[str, Any]] = None, added: Optional[Dict[str, Any]] = None):
+        self.selected = selected
+        self.category = category
+        self.replaced = replaced
+        self.added = added
+
+    @property
+    def is_swap(self) -> bool:
+        return self.added is not None
+
+    @property
+    def product_ids(self) -> List[str]:
+        return [record["product_id"] for record in self.selected]
+
+    @property
+    def total_price(self) -> float:
+        return round(sum(price_of(record) for record in self.selected), 2)
+
+
+def _singular(word: str) -> str:
+    return word[:-1] if word.endswith("s") else word
+
+
+def _category_terms() -> Dict[str, Set[str]]:
+    """Nouns that name each catalog category, e.g. "lamps" -> {lamp, pendant, shade, ...}"""
+    terms = {}
+    for category in catalog.inventory():
+        words = {_singular(category)}
+        for record in catalog.by_category(category):
+            # The last word of the sub category is its noun ("Floor Lamp", "Sofa Beds")
+            sub_words = record.get("category", {}).get("sub", "").lower().split()
+            if sub_words:
+                words.add(_singular(sub_words[-1]))
+        terms[category] = words
+
+    # A noun used by several categories does not name any one of them, except
+    # the category's own name ("Sleeper Armchairs" are filed under sofas)
+    counts = Counter(word for words in terms.values() for word in words)
+    return {
+        category: {word for word in words if counts[word] == 1} | {_singular(category)}
+        for category, words in terms.items()
+    }
+
+
+def target_category(edit_prompt: str) -> Optional[str]:
+    """The single category the edit text talks about, or None"""
+    prompt_terms = {_singular(word) for word in tokenize(edit_prompt)}
+    matches = {
+        category: len(prompt_terms & words)
+        for category, words in _category_terms().items()
+    }
+    best = max(matches.values(), default=0)
+    winners = [category for category, count in matches.items() if count == best]
+    return winners[0] if best > 0 and len(winners) == 1 else None
+
+
+def plan_edit(parent_items: List[str], edit_prompt: str, max_price: float) -> EditPlan:
+    selected = [catalog.get(product_id) for product_id in parent_items]
+    selected = [record for record in selected if record is not None]
+
+    category = target_category(edit_prompt)
+    if category is None:
+        return EditPlan(selected)
+
+    current = next((record for record in selected if catalog.category_of(record["product_id"]) == category), None)
+    current_id = current["product_id"] if current else None
+    kept = [record for record in selected if record["product_id"] != current_id]
+    remaining = max_price - sum(price_of(record) for record in kept)
+
+    prompt_terms = tokenize(edit_prompt)
+    similarities = semantic_scores(edit_prompt, config.semantic_top_k)
+
+    def rank(record):
+        score = score_item(record, prompt_terms) + config.semantic_weight * similarities.get(record["product_id"], 0.0)
+        return -score, price_of(record), record["product_id"]
+
+    candidates = [
+        record for record in catalog.by_category(category)
+        if record["product_id"] != current_id and price_of(record) <= remaining
+    ]
+    if not candidates:
+        print(f"No {category} alternative fits the remaining budget, re-rendering only")
+        return EditPlan(selected)
+
+    added = min(candidates, key=rank)
+    return EditPlan(kept + [added], category, current, added)
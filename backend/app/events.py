@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Dict, Set
+
+# Stages a job goes through, in order; "done" and "failed" are final
+STAGES = ("queued", "selecting", "rendering", "done", "failed")
+FINAL_STAGES = ("done", "failed")
+
+
+class JobEvents:
+    """
+    In-process fan-out of job progress events to live subscribers.
+
+    Events are only delivered to subscribers that are connected when they are
+    published; a new subscriber should read the job's current state first.
+    """
+
+    def __init__(self, max_pending: int = 32):
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(job_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[job_id]
+
+    def has_subscribers(self, job_id: str) -> bool:
+        return job_id in self._subscribers
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                # A stalled client misses intermediate stages, never the last one
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+job_events = JobEvents()
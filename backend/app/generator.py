@@ -1,18 +1,25 @@
+import asyncio
+import json
 import os
-from google import genai
 from PIL import Image
 from io import BytesIO
-from pathlib import Path
 from typing import List, Union
 
 from backend.app import config
-from backend.app import furniture
+from backend.app import providers
+from backend.app.catalog import catalog
+from backend.app.shortlist import shortlist
+from backend.app.vector_index import semantic_scores
+from backend.app import solver
+from backend.app.selection_cache import selection_cache
+from backend.app.resilience import openai_policy, genai_policy
+from backend.app import metrics
+from backend.app.llm_view import prompt_layout, VIEW_VERSION
 
 
-import json
-import os
-from openai import OpenAI
-from backend.app import config
+class NoItemsFitError(Exception):
+    pass
+
 
 class InteriorDesignGenerator:
 
@@ -20,98 +27,92 @@ class InteriorDesignGenerator:
         pass
 
     def load_inventory(self):
-        inventory = {}
-        
-        files = ['/Users/lharchi/Projects/furnishYourHome/scraping/armchairs.json', '/Users/lharchi/Projects/furnishYourHome/scraping/lamps.json', '/Users/lharchi/Projects/furnishYourHome/scraping/sofas.json']
-        for file in files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    inventory[file.replace('.json', '')] = json.load(f)
-            except FileNotFoundError:
-                print(f"Warning: {file} not found")
-                inventory[file.replace('.json', '')] = []
-
-        return inventory
-
-    def generate_system_prompt(self, user_prompt: str, user_price: float):
-        client = OpenAI(api_key=config.openai_api_key)
-
-        # Load all inventory
-        inventory = self.load_inventory()
-
-        # Create the system message with clear instructions
-        system_message = """You are an interior design expert. Your task is to select furniture items from the provided inventory that match the user's requirements and budget. Choose one item per type.
-
-CRITICAL INSTRUCTIONS:
-1. Select items that match the user's style preferences
-2. Stay within or close to the specified budget
-3. Return ONLY valid JSON, no additional text
-4. Use this exact structure:
-
-{
-  "selected_items": [
-    {
-      "product_id": "string",
-      "product_name": "string",
-      "category": "string",
-      "price": number,
-      "reason": "why this item fits the user's request"
-    }
-  ],
-  "total_price": number,
-  "design_rationale": "brief explanation of overall design choices"
-}
-
-DO NOT include any markdown formatting, code blocks, or explanatory text outside the JSON."""
-
-        # Create user message with inventory and request
-        user_message = f"""USER REQUEST: {user_prompt}
-TARGET BUDGET: €{user_price}
-
-AVAILABLE INVENTORY:
-{json.dumps(inventory, indent=2)}
-
-Please select appropriate items that match the style and budget."""
+        """Current catalog records grouped by category"""
+        return catalog.inventory()
+
+    @staticmethod
+    def _format_selection(user_prompt: str, user_price: float, selected: list):
+        if not selected:
+            raise NoItemsFitError(f"No catalog items fit the budget of {user_price:g} EUR")
+        # 0: prompt, 1: product image paths, 2: product ids, 3: total price
+        return [
+            user_prompt,
+            [str(config.data_dir / f"{record['product_id']}.jpg") for record in selected],
+            [record["product_id"] for record in selected],
+            round(sum(record["pricing"]["price"] for record in selected), 2),
+        ]
+
+    async def generate_system_prompt(self, user_prompt: str, user_price: float, selection_mode: str = None):
+        selection_mode = selection_mode or config.selection_mode
+        with metrics.stage_timer("inventory"):
+            similarities = semantic_scores(user_prompt, config.semantic_top_k)
+
+            # Only the best matching, affordable items per category go to the model
+            inventory = shortlist(
+                self.load_inventory(),
+                user_prompt,
+                user_price,
+                config.shortlist_top_k,
+                similarities,
+                config.semantic_weight,
+            )
+
+        if selection_mode == "solver":
+            selected = solver.select_items(inventory, user_prompt, user_price, similarities, config.semantic_weight)
+            return self._format_selection(user_prompt, user_price, selected)
+
+        # Same prompt, budget bucket and catalog: reuse the model's earlier picks
+        cache_key = selection_cache.selection_key(user_prompt, user_price, catalog.fingerprint, f"llm-v{VIEW_VERSION}")
+        cached_ids = await asyncio.to_thread(selection_cache.get, cache_key)
+        if cached_ids is not None:
+            selected = [catalog.get(product_id) for product_id in cached_ids]
+            selected = [record for record in selected if record is not None]
+            selected = solver.repair(selected, inventory, user_prompt, user_price, similarities, config.semantic_weight)
+            return self._format_selection(user_prompt, user_price, selected)
+
+        await providers.ready()
+        client = providers.openai_client()
 
         try:
+            # Static instructions, then the shortlisted candidates, budget and prompt
+            messages = prompt_layout.messages(user_prompt, user_price, inventory)
+
             # Call OpenAI API with JSON mode
-            response = client.chat.completions.create(
-                model="gpt-4o",  # or "gpt-4-turbo" or "gpt-3.5-turbo"
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                response_format={"type": "json_object"},  # Forces JSON output
-                temperature=0.7
-            )
+            async def create_completion():
+                async with providers.slots("openai"):
+                    return await client.chat.completions.create(
+                        model="gpt-4o",  # or "gpt-4-turbo" or "gpt-3.5-turbo"
+                        messages=messages,
+                        response_format={"type": "json_object"},  # Forces JSON output
+                        temperature=0.7,
+                    )
+
+            # Deadline, retries, hedging and circuit breaker
+            with metrics.stage_timer("selection"):
+                response = await openai_policy.call(create_completion)
+            metrics.record_openai_usage(response.usage)
 
             # Parse the response
             result = json.loads(response.choices[0].message.content)
 
-            # Extract data for return format
-            selected_items = result.get('selected_items', [])
-            total_price = result.get('total_price', 0)
+            # Prices come from the catalog, not from the model, and the
+            # selection is repaired if the model went over budget
+            selected = [catalog.get(item.get('product_id')) for item in result.get('selected_items', [])]
+            selected = [record for record in selected if record is not None]
+            selected = solver.repair(selected, inventory, user_prompt, user_price, similarities, config.semantic_weight)
 
-            # Format item names for return
-            running_items = [item['product_id'] for item in selected_items]
-
-            # Extract image paths based on product IDs
-            running_images = [f"/Users/lharchi/Projects/furnishYourHome/data/{item['product_id']}.jpg" for item in selected_items]
-
-            # Return in your specified format
-            return [
-                user_prompt,
-                running_images,
-                running_items,
-                total_price
-            ]
+            selection = self._format_selection(user_prompt, user_price, selected)
+            await asyncio.to_thread(selection_cache.put, cache_key, [record["product_id"] for record in selected])
+            return selection
 
         except json.JSONDecodeError as e:
             print(f"JSON parsing error: {e}")
-            return [user_prompt, [], [], 0]
         except Exception as e:
             print(f"API call error: {e}")
-            return [user_prompt, [], [], 0]
+
+        # Fall back to the local solver rather than rendering an empty room
+        selected = solver.select_items(inventory, user_prompt, user_price, similarities, config.semantic_weight)
+        return self._format_selection(user_prompt, user_price, selected)
 
 
 class ImageGeneratorG:
@@ -123,23 +124,68 @@ class ImageGeneratorG:
             api_key: Google AI API key. If None, will try to read from GOOGLE_API_KEY env variable
         """
 
-        self.client = genai.Client(api_key=config.google_api_key)
-        self.model = "gemini-2.5-flash-image-preview"
+        self.model = config.image_model
+
+    @property
+    def client(self):
+        # Shared client, created once the SDK has loaded (see providers.ready)
+        return providers.genai_client()
 
-    def generate_system_prompt(self, user_prompt: str, user_price: float):
+    async def generate_system_prompt(self, user_prompt: str, user_price: float, selection_mode: str = None):
         # 0: actual_prompt_from_openai
         # 1: running_images (filePath)
         # 2: running_items (json)
         # 3: total price
         generator = InteriorDesignGenerator()
-        results = generator.generate_system_prompt(user_prompt, user_price)
+        results = await generator.generate_system_prompt(user_prompt, user_price, selection_mode)
         return results
 
 
-    def generate_image(
+    @staticmethod
+    def _load_images(input_images: List[Union[str, bytes, Image.Image]]) -> list:
+        from google.genai import types
+
+        images = []
+        for img in input_images:
+            if isinstance(img, bytes):
+                # Already encoded (see assets.ProductImageCache), sent as-is
+                pil_image = types.Part.from_bytes(data=img, mime_type="image/jpeg")
+            elif isinstance(img, str):
+                # Load image from path
+                pil_image = Image.open(img)
+                pil_image.load()
+            elif isinstance(img, Image.Image):
+                pil_image = img
+            else:
+                raise ValueError(f"Invalid image type: {type(img)}")
+
+            images.append(pil_image)
+        return images
+
+    @staticmethod
+    def _payload_bytes(input_images: List[Union[str, bytes, Image.Image]]) -> int:
+        """Approximate size of the reference images; PIL images are counted as raw pixels"""
+        total = 0
+        for img in input_images:
+            if isinstance(img, bytes):
+                total += len(img)
+            elif isinstance(img, str):
+                total += os.path.getsize(img)
+            elif isinstance(img, Image.Image):
+                total += len(img.tobytes())
+        return total
+
+    @staticmethod
+    def _save_image(data: bytes, output_path: str) -> Image.Image:
+        generated_image = Image.open(BytesIO(data))
+        generated_image.save(output_path)
+        print(f"Image saved to: {output_path}")
+        return generated_image
+
+    async def generate_image(
             self,
             prompt: str,
-            input_images: List[Union[str, Image.Image]] = None,
+            input_images: List[Union[str, bytes, Image.Image]] = None,
             output_path: str = "output_image.png"
     ) -> Image.Image:
         """
@@ -147,27 +193,19 @@ class ImageGeneratorG:
 
         Args:
             prompt: Text description of the desired image
-            input_images: List of image paths or PIL Image objects to use as reference/input
+            input_images: List of image paths, encoded JPEG bytes or PIL Image objects to use as reference/input
             output_path: Path where the generated image will be saved
 
         Returns:
             PIL Image object of the generated image
         """
-        # Prepare the content list
-        contents = []
+        await providers.ready()
 
-        # Add input images if provided
+        # Prepare the content list; disk reads and decoding run off the event loop
+        contents = []
         if input_images:
-            for img in input_images:
-                if isinstance(img, str):
-                    # Load image from path
-                    pil_image = Image.open(img)
-                elif isinstance(img, Image.Image):
-                    pil_image = img
-                else:
-                    raise ValueError(f"Invalid image type: {type(img)}")
-
-                contents.append(pil_image)
+            with metrics.stage_timer("image_encode"):
+                contents.extend(await asyncio.to_thread(self._load_images, input_images))
 
         # Add the text prompt
         contents.append(prompt)
@@ -177,20 +215,27 @@ class ImageGeneratorG:
             print(f"Using {len(input_images)} input image(s)")
 
         # Generate the image
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=contents
-        )
+        async def generate_content():
+            async with providers.slots("genai"):
+                return await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=contents
+                )
+
+        with metrics.stage_timer("render"):
+            response = await genai_policy.call(generate_content)
 
         # Extract and save the generated image
         generated_image = None
+        received = 0
         for part in response.candidates[0].content.parts:
             if part.text is not None:
                 print(f"Model response text: {part.text}")
             elif part.inline_data is not None:
-                generated_image = Image.open(BytesIO(part.inline_data.data))
-                generated_image.save(output_path)
-                print(f"Image saved to: {output_path}")
+                received += len(part.inline_data.data)
+                with metrics.stage_timer("save"):
+                    generated_image = await asyncio.to_thread(self._save_image, part.inline_data.data, output_path)
+        metrics.record_render(self._payload_bytes(input_images or []), received)
 
         if generated_image is None:
             raise RuntimeError("No image was generated in the response")
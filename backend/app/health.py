@@ -1,38 +1,120 @@
-from fastapi import APIRouter, Response, status
+import asyncio
+import time
 from datetime import datetime, timezone
-from openai import OpenAI
 
+from fastapi import APIRouter, Response, status
 
 from backend.app import config
+from backend.app import providers
+from backend.app.catalog import catalog
 
 router = APIRouter()
 
-@router.get("/")
-def get_health(
-        response: Response,
-):
-    client = OpenAI(api_key=config.openai_api_key)
+# Result of the last background provider check; probes only ever read this
+_provider_status = {
+    "openai": None,
+    "google": None,
+    "checked_at": None,
+    "errors": {},
+}
+_checked_monotonic = None
+_probe_task = None
 
-    openai_status = False
 
+async def _check(name: str, call):
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "Say 'API test successful.'"}],
-            max_tokens=10
-        )
+        await asyncio.wait_for(call(), timeout=config.health_check_timeout)
+        _provider_status["errors"].pop(name, None)
+        return True
+    except Exception as e:
+        print(f"Health check for {name} failed: {e}")
+        _provider_status["errors"][name] = str(e)
+        return False
 
-        print("OpenAI API connection successful!")
-        print("Response:", response.choices[0].message.content.strip())
-        openai_status = True
 
-    except Exception as e:
-        print("OpenAI API test failed.")
-        print("Error:", e)
+async def check_providers():
+    """Listing or fetching model metadata is free and does not use quota"""
+    global _checked_monotonic
+    openai_ok, google_ok = await asyncio.gather(
+        _check("openai", lambda: providers.openai_client().models.list()),
+        _check("google", lambda: providers.genai_client().aio.models.get(model=config.image_model)),
+    )
+    _provider_status["openai"] = openai_ok
+    _provider_status["google"] = google_ok
+    _provider_status["checked_at"] = datetime.now(timezone.utc).isoformat()
+    _checked_monotonic = time.monotonic()
+
+
+async def _probe_loop():
+    await providers.ready()
+    while True:
+        await check_providers()
+        await asyncio.sleep(config.health_check_interval)
+
+
+def start():
+    global _probe_task
+    if _probe_task is None:
+        _probe_task = asyncio.create_task(_probe_loop(), name="health-probe")
+
 
+async def stop():
+    global _probe_task
+    if _probe_task is not None:
+        _probe_task.cancel()
+        await asyncio.gather(_probe_task, return_exceptions=True)
+        _probe_task = None
 
+
+def _check_age():
+    if _checked_monotonic is None:
+        return None
+    return round(time.monotonic() - _checked_monotonic, 3)
+
+
+@router.get("/live")
+async def get_liveness():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def get_readiness(response: Response):
+    """
+    Ready when the catalog is loaded and the last provider check, no older
+    than a few check intervals, succeeded. Never calls the providers itself.
+    """
+    age = _check_age()
+    ready = (
+        len(catalog) > 0
+        and age is not None
+        and age < 3 * config.health_check_interval
+        and bool(_provider_status["openai"])
+        and bool(_provider_status["google"])
+    )
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "ready": ready,
+        "catalog_products": len(catalog),
+        "openai": _provider_status["openai"],
+        "google": _provider_status["google"],
+        "checked_at": _provider_status["checked_at"],
+        "check_age_seconds": age,
+    }
+
+
+@router.get("/")
+async def get_health(
+        response: Response,
+):
     return {
         "status": status.HTTP_200_OK,
         "server_time_utc": datetime.now(timezone.utc).isoformat(),
-        "openai": openai_status,
-    }
\ No newline at end of file
+        "openai": bool(_provider_status["openai"]),
+        "google": bool(_provider_status["google"]),
+        "checked_at": _provider_status["checked_at"],
+        "check_age_seconds": _check_age(),
+        "errors": _provider_status["errors"],
+    }
@@ -0,0 +1,223 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.app import config
+
+# Jobs in these states are never evicted and are resumed after a restart
+ACTIVE_STATUSES = ("queued", "running")
+# Parent record of a /jobs/generate-batch request; kept while any of its jobs is active
+BATCH_STATUS = "batch"
+
+
+class JobStore:
+    """
+    Storage for job status and results.
+
+    Jobs are plain dicts with at least a "status" key. get() returns a copy;
+    changes go through update() so backends can keep their indexes current.
+    """
+
+    def create(self, job_id: str, job: Dict[str, Any]):
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields):
+        raise NotImplementedError
+
+    def delete(self, job_id: str):
+        raise NotImplementedError
+
+    def list_by_status(self, status: str, limit: int = 100) -> List[Tuple[str, Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def count_by_status(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+
+class MemoryJobStore(JobStore):
+    """
+    Process-local store. Finished jobs are evicted oldest first once there are
+    more than max_jobs of them or they are older than max_age seconds.
+    """
+
+    def __init__(self, max_jobs: int = 1000, max_age: float = 24 * 3600):
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._created: Dict[str, float] = {}
+        self._by_status: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, job_id: str, old_status: Optional[str], new_status: Optional[str]):
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            self._by_status.get(old_status, OrderedDict()).pop(job_id, None)
+        if new_status is not None:
+            self._by_status.setdefault(new_status, OrderedDict())[job_id] = None
+
+    def _evict(self):
+        now = time.time()
+        finished = len(self._jobs) - sum(len(self._by_status.get(status, ())) for status in ACTIVE_STATUSES)
+        for job_id in list(self._jobs):
+            if finished <= self.max_jobs and now - self._created[job_id] <= self.max_age:
+                break
+            job = self._jobs[job_id]
+            status = job["status"]
+            if status in ACTIVE_STATUSES or (status == BATCH_STATUS and self._has_active(job["job_ids"])):
+                continue
+            self._index(job_id, status, None)
+            del self._jobs[job_id]
+            del self._created[job_id]
+            finished -= 1
+
+    def _has_active(self, job_ids: List[str]) -> bool:
+        return any(job_id in self._jobs and self._jobs[job_id]["status"] in ACTIVE_STATUSES for job_id in job_ids)
+
+    def create(self, job_id: str, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job_id] = dict(job)
+            self._created[job_id] = time.time()
+            self._index(job_id, None, job["status"])
+            self._evict()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            old_status = job["status"]
+            job.update(fields)
+            self._index(job_id, old_status, job["status"])
+
+    def delete(self, job_id: str):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                self._created.pop(job_id, None)
+                self._index(job_id, job["status"], None)
+
+    def list_by_status(self, status: str, limit: int = 100) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            job_ids = list(self._by_status.get(status, ()))[:limit]
+            return [(job_id, dict(self._jobs[job_id])) for job_id in job_ids]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: len(job_ids) for status, job_ids in self._by_status.items() if job_ids}
+
+
+class SqliteJobStore(JobStore):
+    """
+    Durable store in a SQLite file (WAL mode), indexed by status. Finished
+    jobs older than max_age seconds are purged.
+    """
+
+    def __init__(self, path: Path, max_age: float = 7 * 24 * 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._db.commit()
+        return self._db
+
+    def _purge(self, db: sqlite3.Connection):
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+        db.execute(
+            f"DELETE FROM jobs WHERE created_at < ? AND status NOT IN ({placeholders})"
+            f" AND NOT (status = ? AND EXISTS (SELECT 1 FROM jobs AS child"
+            f"  WHERE child.status IN ({placeholders}) AND json_extract(child.data, '$.batch_id') = jobs.job_id))",
+            (now - self.max_age, *ACTIVE_STATUSES, BATCH_STATUS, *ACTIVE_STATUSES),
+        )
+
+    def create(self, job_id: str, job: Dict[str, Any]):
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job_id, job["status"], time.time(), json.dumps(job)),
+            )
+            self._purge(db)
+            db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            db = self._connection()
+            row = db.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            job.update(fields)
+            db.execute(
+                "UPDATE jobs SET status = ?, data = ? WHERE job_id = ?",
+                (job["status"], json.dumps(job), job_id),
+            )
+            db.commit()
+
+    def delete(self, job_id: str):
+        with self._lock:
+            db = self._connection()
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            db.commit()
+
+    def list_by_status(self, status: str, limit: int = 100) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT job_id, data FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?",
+                (status, limit),
+            ).fetchall()
+        return [(job_id, json.loads(data)) for job_id, data in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def create_job_store() -> JobStore:
+    if config.job_store == "sqlite":
+        return SqliteJobStore(config.job_store_path, config.job_store_max_age)
+    return MemoryJobStore(config.job_store_max_jobs, config.job_store_max_age)
+
+
+job_store = create_job_store()
@@ -1,31 +1,92 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import asyncio
 import json
-
+import math
+import shutil
 import uuid
 
 from datetime import datetime
 
+from backend.app import config
 from backend.app.generator import ImageGeneratorG
+from backend.app.render_cache import render_cache, file_sha256
+from backend.app.scheduler import scheduler, QueueFullError
+from backend.app.job_store import job_store, ACTIVE_STATUSES, BATCH_STATUS
+from backend.app.events import job_events, FINAL_STAGES
+from backend.app.assets import product_images
+from backend.app.uploads import save_room_image, UploadTooLargeError, InvalidImageError
+from backend.app.results import results_store, VARIANTS
+from backend.app.edits import plan_edit
+from backend.app import metrics
 
 router = APIRouter()
 
-# In-memory storage for job status and results
-jobs_db = {}
+
+def _job_results(job: Dict[str, Any]):
+    return {
+        "job_status": job["status"],
+        "total_price": job.get("total_price", 0),
+        "items": job.get("items", []),
+        "image_url": job.get("image_url"),
+    }
+
+
+def _job_event(job_id: str, job: Dict[str, Any]):
+    event = {
+        "job_id": job_id,
+        "job_status": job["status"],
+        "stage": job.get("stage", job["status"]),
+    }
+    if job["status"] == "done":
+        event["results"] = _job_results(job)
+    elif job["status"] == "failed":
+        event["error"] = job.get("error")
+    return event
+
+
+def _get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """The job, or None when there is none or the id belongs to a batch (see /jobs/batch)"""
+    job = job_store.get(job_id)
+    if job is None or job["status"] == BATCH_STATUS:
+        return None
+    return job
+
+
+def _update_job(job_id: str, **fields):
+    """Store the change and push it to anyone streaming this job's events"""
+    job_store.update(job_id, **fields)
+    if fields.get("status") in FINAL_STAGES:
+        metrics.jobs_finished.labels(status=fields["status"]).inc()
+    if job_events.has_subscribers(job_id):
+        job = job_store.get(job_id)
+        if job is not None:
+            job_events.publish(job_id, _job_event(job_id, job))
+
 
 @router.get("/status/{job_id}")
 def get_job_status(job_id: str):
     """
     returns the status of the job ["queued", "running", "done", "failed"]
     """
-    if job_id not in jobs_db:
+    job = _get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return {
-        "job_status": jobs_db[job_id]["status"],
+    response = {
+        "job_status": job["status"],
+        "stage": job.get("stage", job["status"]),
     }
 
+    position = scheduler.position(job_id)
+    if position is not None:
+        response["queue_position"] = position
+        response["estimated_wait_seconds"] = scheduler.estimated_wait(position)
+
+    return response
+
 
 @router.get("/results/{job_id}")
 def get_job_results(job_id: str):
@@ -33,74 +94,326 @@ def get_job_results(job_id: str):
     returns the results of the job
     """
 
-    if job_id not in jobs_db:
+    job = _get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = jobs_db[job_id]
-
     if job["status"] != "done":
         raise HTTPException(
             status_code=400,
             detail=f"Job is not completed yet. Current status: {job['status']}"
         )
 
+    return _job_results(job)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match is "*" or a comma-separated list of (possibly weak) ETags"""
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(tag.strip() == "*" or opaque(tag) == opaque(etag) for tag in if_none_match.split(","))
+
+
+@router.api_route("/image/{job_id}", methods=["GET", "HEAD"])
+async def get_job_image(job_id: str, request: Request, variant: str = "auto"):
+    """
+    returns the generated room image
+    variant: "auto" (AVIF or WebP if the Accept header allows, else PNG), "png", "webp", "avif" or "thumb"
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if variant == "auto":
+        variant = results_store.best_variant(job_id, request.headers.get("accept", ""))
+        # Which file "auto" picks changes once the AVIF exists, so revalidate every time
+        headers = {"Cache-Control": "public, no-cache", "Vary": "Accept"}
+    elif variant in VARIANTS:
+        # A named variant never changes once written, so clients and proxies may keep it
+        headers = {"Cache-Control": "public, max-age=31536000, immutable"}
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown variant, expected one of {list(VARIANTS)}")
+
+    path = results_store.path_for(job_id, variant) if variant else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    response = FileResponse(path, media_type=VARIANTS[variant][1], headers=headers, stat_result=path.stat())
+
+    etag = response.headers["etag"]
+    if _etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers={"ETag": etag, **headers})
+    return response
+
+
+def _current_event(job_id: str):
+    """The job's current state; a job deleted or evicted meanwhile ends the stream as failed"""
+    job = _get_job(job_id) or {"status": "failed", "error": "Job expired"}
+    return _job_event(job_id, job)
+
+
+@router.get("/events/{job_id}")
+async def stream_job_events(job_id: str):
+    """
+    Server-Sent Events stream of the job's stages
+    ["queued", "selecting", "rendering", "done", "failed"].
+    The first event is the current state; the "done" event carries the results.
+    """
+    if _get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        # Subscribe before reading the current state so no transition is lost
+        queue = job_events.subscribe(job_id)
+        try:
+            event = _current_event(job_id)
+            while True:
+                yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+                if event["stage"] in FINAL_STAGES:
+                    return
+
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=config.sse_keepalive_interval)
+                        break
+                    except asyncio.TimeoutError:
+                        if _get_job(job_id) is None:
+                            event = _current_event(job_id)
+                            break
+                        yield ": keep-alive\n\n"
+        finally:
+            job_events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/list")
+def list_jobs(status: str = "queued", limit: int = 100):
+    """
+    returns the jobs currently in the given status, oldest first
+    """
     return {
-        "job_status": job["status"],
-        "total_price": job.get("total_price", 0),
-        "items": job.get("items", []),
+        "counts": job_store.count_by_status(),
+        "jobs": [
+            {"job_id": job_id, "created_at": job.get("created_at"), "params": job.get("params")}
+            for job_id, job in job_store.list_by_status(status, limit)
+        ],
     }
 
 
-def process_job(job_id: str, image_bytes: bytes, params_dict: Dict[str, Any]):
+async def _render_job(
+        job_id: str,
+        generator: ImageGeneratorG,
+        prompt: str,
+        base_image_path: str,
+        product_ids: List[str],
+        total_price: float,
+        reference_ids: Optional[List[str]] = None,
+        base_image_sha256: Optional[str] = None,
+):
     """
-    This function runs in the background
+    Render (or reuse a cached render of) base_image_path with the reference
+    product images, then mark the job done. reference_ids defaults to product_ids.
     """
+    reference_ids = product_ids if reference_ids is None else reference_ids
+    output_path = str(results_store.path_for(job_id))
+
+    # Identical base image, products and prompt: serve the stored render
+    if base_image_sha256 is None:
+        base_image_sha256 = await asyncio.to_thread(file_sha256, base_image_path)
+    render_key = render_cache.key(base_image_sha256, reference_ids, prompt, generator.model)
+    cached_render = render_cache.get(render_key)
+
+    if cached_render is not None:
+        print(f"Render cache hit for job {job_id}")
+        await asyncio.to_thread(shutil.copyfile, cached_render, output_path)
+    else:
+        _update_job(job_id, stage="rendering")
+
+        # Product images come pre-scaled and pre-encoded from the asset cache
+        running_images = []
+        with metrics.stage_timer("image_load"):
+            for product_id in reference_ids:
+                product_image = await asyncio.to_thread(product_images.get, product_id)
+                if product_image is not None:
+                    running_images.append(product_image)
+        running_images.append(base_image_path)
+
+        print ("="*60)
+        print ("I am going to process job with this prompt: " + prompt)
+        print("I am going to process job with these images: " + str(reference_ids))
+
+        await generator.generate_image(
+            prompt=prompt,
+            input_images=running_images,
+            output_path=output_path
+        )
+        await asyncio.to_thread(render_cache.put, render_key, output_path)
+
+    # Clients fetch the image as soon as they see "done"; have the WebP ready by then
+    try:
+        with metrics.stage_timer("variant_webp"):
+            await asyncio.to_thread(results_store.create_webp, job_id)
+    except Exception as e:
+        print(f"Could not create the WebP variant for job {job_id}: {e}")
+
+    # Update with results
+    _update_job(
+        job_id,
+        status="done",
+        stage="done",
+        items=product_ids,
+        total_price=total_price,
+        image_url=f"/jobs/image/{job_id}",
+        completed_at=datetime.now().isoformat(),
+    )
+
+    # AVIF and the thumbnail take seconds; encode them without holding this worker
+    task = asyncio.create_task(_create_variants(job_id), name=f"variants-{job_id}")
+    _variant_tasks.add(task)
+    task.add_done_callback(_variant_tasks.discard)
+
+
+# Keeps the running variant encodes referenced until they finish
+_variant_tasks = set()
+
+
+async def _create_variants(job_id: str):
     try:
-        jobs_db[job_id]["status"] = "running"
-        jobs_db[job_id]["started_at"] = datetime.now().isoformat()
+        with metrics.stage_timer("variants_background"):
+            await asyncio.to_thread(results_store.create_variants, job_id)
+    except Exception as e:
+        print(f"Could not create image variants for job {job_id}: {e}")
+
+
+async def process_job(job_id: str, params_dict: Dict[str, Any]):
+    """
+    This function runs in the background, on one of the scheduler's workers
+    """
+    try:
+        _update_job(job_id, status="running", stage="selecting", started_at=datetime.now().isoformat())
 
         generator = ImageGeneratorG()
 
         user_prompt = params_dict["prompt"]
         user_price = params_dict["max_price"]
 
-        system_prompt = generator.generate_system_prompt(user_prompt, user_price)
+        system_prompt = await generator.generate_system_prompt(user_prompt, user_price, params_dict.get("selection_mode"))
 
         print ("system prompt is: ", system_prompt)
 
-        running_prompt = system_prompt[0]
-        running_images = system_prompt[1]
-        running_images.append(str("/Users/lharchi/Projects/furnishYourHome/input/" + str(job_id) + ".jpeg"))
-
-        print ("="*60)
-        print ("I am going to process job with this prompt: " + running_prompt)
-        print("I am going to process job with these images: " + str(running_images))
-
-        image = generator.generate_image(
-            prompt=running_prompt,
-            input_images=running_images,
-            output_path=("/Users/lharchi/Projects/furnishYourHome/frontend/public/" + str(job_id) + ".png")
+        job = job_store.get(job_id)
+        await _render_job(
+            job_id,
+            generator,
+            prompt=system_prompt[0],
+            base_image_path=job.get("room_image") or str(config.input_dir / f"{job_id}.jpeg"),
+            product_ids=system_prompt[2],
+            total_price=system_prompt[3],
+            base_image_sha256=job.get("room_image_sha256"),
         )
 
-        results_items = system_prompt[2]
-        total_price = system_prompt[3]
+    except Exception as e:
+        print(e)
+        _update_job(job_id, status="failed", stage="failed", error=str(e))
 
-        # Update with results
-        jobs_db[job_id]["status"] = "done"
-        jobs_db[job_id]["items"] = results_items
-        jobs_db[job_id]["total_price"] = total_price
 
-        jobs_db[job_id]["completed_at"] = datetime.now().isoformat()
+async def process_edit_job(job_id: str, params_dict: Dict[str, Any]):
+    """
+    Edit of a finished job: keeps the parent's selection and renders on top of
+    its generated image, swapping at most one item. No selection model call.
+    """
+    try:
+        _update_job(job_id, status="running", stage="selecting", started_at=datetime.now().isoformat())
+
+        parent_job_id = params_dict["parent_job_id"]
+        parent = job_store.get(parent_job_id)
+        if parent is None:
+            raise RuntimeError(f"Parent job {parent_job_id} no longer exists")
+
+        edit_prompt = params_dict["edit_prompt"]
+        plan = await asyncio.to_thread(plan_edit, parent.get("items", []), edit_prompt, params_dict["max_price"])
+
+        if plan.is_swap:
+            item = plan.category.rstrip('s')
+            if plan.replaced is not None:
+                print(f"Edit {job_id}: replacing {plan.replaced['product_id']} with {plan.added['product_id']}")
+                change = f"Replace the {item} in the last image with the one shown in the first image."
+            else:
+                # The parent room has nothing of this category yet
+                print(f"Edit {job_id}: adding {plan.added['product_id']}")
+                change = f"Add the {item} shown in the first image to the room in the last image."
+            prompt = f"{change} Keep everything else in the room unchanged. {edit_prompt}"
+            reference_ids = [plan.added["product_id"]]
+        else:
+            prompt = f"Edit this room image: {edit_prompt}. Keep the furniture and the room layout unchanged."
+            reference_ids = []
+
+        await _render_job(
+            job_id,
+            ImageGeneratorG(),
+            prompt=prompt,
+            base_image_path=str(results_store.path_for(parent_job_id)),
+            product_ids=plan.product_ids,
+            total_price=plan.total_price,
+            reference_ids=reference_ids,
+        )
 
     except Exception as e:
         print(e)
-        jobs_db[job_id]["status"] = "failed"
-        jobs_db[job_id]["error"] = str(e)
+        _update_job(job_id, status="failed", stage="failed", error=str(e))
+
+
+def _processor_for(params_dict: Dict[str, Any]):
+    return process_edit_job if "parent_job_id" in params_dict else process_job
+
+
+def recover_jobs():
+    """
+    Requeue jobs that were queued or running when the process stopped.
+    Only durable job stores have any.
+    """
+    for status in ACTIVE_STATUSES:
+        for job_id, job in job_store.list_by_status(status, limit=config.job_queue_size):
+            job_store.update(job_id, status="queued", stage="queued")
+            try:
+                scheduler.submit(job_id, _processor_for(job["params"]), job_id, job["params"])
+                print(f"Recovered job {job_id} ({status})")
+            except QueueFullError:
+                job_store.update(job_id, status="failed", stage="failed", error="Server restarted and the queue was full")
+
+
+def _parse_max_price(value: Any) -> Optional[float]:
+    """max_price as a float ("800" is accepted), or None if it is not a non-negative number"""
+    if isinstance(value, bool):
+        return None
+    try:
+        max_price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return max_price if math.isfinite(max_price) and max_price >= 0 else None
+
+
+_INVALID_MAX_PRICE = {"error": "'max_price' must be a non-negative number"}
+
+
+def _queue_full_response(retry_after: int):
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Too many jobs in progress, please retry later"},
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 @router.post("/generate")
 async def generate(
-        background_tasks: BackgroundTasks,
         image: UploadFile = File(...),
         params: str = Form(...),
 ):
@@ -108,6 +421,7 @@ async def generate(
     (multipart/form-data):
     image: (file)
     params: '{"prompt": "prompt text with all the cool stuff", "max_price": 1000}'
+            optional "selection_mode": "llm" | "solver" (pick items locally, no OpenAI call)
     """
 
     # Parse the params string into a Python dict
@@ -118,35 +432,280 @@ async def generate(
             status_code=400,
             content={"error": "Invalid JSON in 'params' field"},
         )
+    if not isinstance(params_dict, dict):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "'params' must be a JSON object"},
+        )
 
-    # Example of accessing parameters
-    prompt = params_dict.get("prompt")
-    max_price = params_dict.get("max_price")
+    max_price = _parse_max_price(params_dict.get("max_price"))
+    if max_price is None:
+        return JSONResponse(status_code=400, content=_INVALID_MAX_PRICE)
+    params_dict["max_price"] = max_price
 
-    # Read image bytes (optional)
-    image_bytes = await image.read()
+    # Reject early, before the upload is stored
+    if not scheduler.has_capacity():
+        return _queue_full_response(scheduler.retry_after())
 
     job_id = str(uuid.uuid4())
 
-    # Save uploaded image to folder
-    upload_folder = "/Users/lharchi/Projects/furnishYourHome/input"
-    image_path = upload_folder + "/" + f"{job_id}.jpeg"
-
-    with open(image_path, "wb") as f:
-        f.write(image_bytes)
+    # Stream the upload to disk and normalize it; the job only keeps the path
+    image_path = config.input_dir / f"{job_id}.jpeg"
+    try:
+        with metrics.stage_timer("upload"):
+            await asyncio.to_thread(
+                save_room_image,
+                image.file,
+                image_path,
+                config.max_upload_bytes,
+                config.room_image_max_edge,
+                config.room_image_quality,
+            )
+    except UploadTooLargeError:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Image is larger than {config.max_upload_bytes // (1024 * 1024)} MB"},
+        )
+    except InvalidImageError:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "The uploaded file is not a readable image"},
+        )
 
     # Initialize job in database
-    jobs_db[job_id] = {
+    job_store.create(job_id, {
         "status": "queued",
+        "stage": "queued",
         "created_at": datetime.now().isoformat(),
         "filename": image.filename,
+        "room_image": str(image_path),
         "params": params_dict,
-    }
+    })
 
     # start the job
-    background_tasks.add_task(process_job, job_id, image_bytes, params_dict)
+    try:
+        position = scheduler.submit(job_id, process_job, job_id, params_dict)
+    except QueueFullError as e:
+        job_store.delete(job_id)
+        image_path.unlink(missing_ok=True)
+        return _queue_full_response(e.retry_after)
 
     return {
         "job_id": job_id,
         "message": "Job queued successfully",
+        "queue_position": position,
+        "estimated_wait_seconds": scheduler.estimated_wait(position),
+    }
+
+
+class EditRequest(BaseModel):
+    edit_prompt: str
+    max_price: Optional[float] = None
+
+
+@router.post("/edit/{job_id}")
+async def edit(job_id: str, request: EditRequest):
+    """
+    (application/json):
+    {"edit_prompt": "swap the lamp for something brass", "max_price": 1000}
+    max_price defaults to the parent job's budget.
+
+    Starts from the finished job's selection and generated image. Naming a
+    category swaps that one item; any other wording only re-renders.
+    """
+    parent = _get_job(job_id)
+    if parent is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if parent["status"] != "done" or not results_store.path_for(job_id).exists():
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only finished jobs can be edited. Current status: {parent['status']}"
+        )
+    if not request.edit_prompt.strip():
+        raise HTTPException(status_code=400, detail="edit_prompt must not be empty")
+
+    if not scheduler.has_capacity():
+        return _queue_full_response(scheduler.retry_after())
+
+    parent_params = parent.get("params", {})
+    params_dict = {
+        "prompt": parent_params.get("prompt", ""),
+        "edit_prompt": request.edit_prompt,
+        "max_price": request.max_price if request.max_price is not None else parent_params.get("max_price", 0),
+        "parent_job_id": job_id,
+    }
+
+    edit_job_id = str(uuid.uuid4())
+    job_store.create(edit_job_id, {
+        "status": "queued",
+        "stage": "queued",
+        "created_at": datetime.now().isoformat(),
+        "filename": parent.get("filename"),
+        "room_image": parent.get("room_image"),
+        "params": params_dict,
+    })
+
+    try:
+        position = scheduler.submit(edit_job_id, process_edit_job, edit_job_id, params_dict)
+    except QueueFullError as e:
+        job_store.delete(edit_job_id)
+        return _queue_full_response(e.retry_after)
+
+    return {
+        "job_id": edit_job_id,
+        "parent_job_id": job_id,
+        "message": "Edit job queued successfully",
+        "queue_position": position,
+        "estimated_wait_seconds": scheduler.estimated_wait(position),
+    }
+
+
+def _batch_status(statuses: List[str]) -> str:
+    if "running" in statuses:
+        return "running"
+    if "queued" in statuses:
+        return "queued"
+    if all(status == "done" for status in statuses):
+        return "done"
+    if all(status == "failed" for status in statuses):
+        return "failed"
+    return "partial"
+
+
+@router.get("/batch/{batch_id}")
+def get_batch(batch_id: str):
+    """
+    returns the combined status of a batch and the status (and results, once done) of each variant
+    job_status: "queued", "running", "done", "failed" or "partial" (finished, some variants failed)
+    """
+    batch = job_store.get(batch_id)
+    if batch is None or batch["status"] != BATCH_STATUS:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    jobs = []
+    for job_id in batch["job_ids"]:
+        job = job_store.get(job_id) or {"status": "failed", "error": "Job expired"}
+        entry = {
+            "job_id": job_id,
+            "job_status": job["status"],
+            "stage": job.get("stage", job["status"]),
+            "params": job.get("params"),
+        }
+        if job["status"] == "done":
+            entry["results"] = _job_results(job)
+        elif job["status"] == "failed":
+            entry["error"] = job.get("error")
+        jobs.append(entry)
+
+    return {
+        "batch_id": batch_id,
+        "job_status": _batch_status([job["job_status"] for job in jobs]),
+        "jobs": jobs,
+    }
+
+
+@router.post("/generate-batch")
+async def generate_batch(
+        image: UploadFile = File(...),
+        params: str = Form(...),
+):
+    """
+    (multipart/form-data):
+    image: (file)
+    params: '[{"prompt": "scandinavian", "max_price": 800}, {"prompt": "industrial", "max_price": 1500}]'
+
+    One job per variant, all sharing the uploaded room image, which is stored
+    and normalized once. The variants run concurrently; follow them with
+    GET /jobs/batch/{batch_id} or each job's own endpoints.
+    """
+    try:
+        variants = json.loads(params)
+    except json.JSONDecodeError:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Invalid JSON in 'params' field"},
+        )
+
+    if (
+            not isinstance(variants, list)
+            or not variants
+            or not all(isinstance(v, dict) and "prompt" in v and "max_price" in v for v in variants)
+    ):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "'params' must be a non-empty list of {\"prompt\", \"max_price\"} objects"},
+        )
+    if len(variants) > config.batch_max_variants:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"At most {config.batch_max_variants} variants per batch"},
+        )
+    for params_dict in variants:
+        params_dict["max_price"] = _parse_max_price(params_dict["max_price"])
+        if params_dict["max_price"] is None:
+            return JSONResponse(status_code=400, content=_INVALID_MAX_PRICE)
+
+    # The whole batch is queued or none of it
+    if not scheduler.has_capacity(len(variants)):
+        return _queue_full_response(scheduler.retry_after())
+
+    batch_id = str(uuid.uuid4())
+
+    image_path = config.input_dir / f"{batch_id}.jpeg"
+    try:
+        with metrics.stage_timer("upload"):
+            await asyncio.to_thread(
+                save_room_image,
+                image.file,
+                image_path,
+                config.max_upload_bytes,
+                config.room_image_max_edge,
+                config.room_image_quality,
+            )
+    except UploadTooLargeError:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Image is larger than {config.max_upload_bytes // (1024 * 1024)} MB"},
+        )
+    except InvalidImageError:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "The uploaded file is not a readable image"},
+        )
+    image_sha256 = await asyncio.to_thread(file_sha256, image_path)
+
+    # Other requests may have filled the queue while the upload was stored
+    if not scheduler.has_capacity(len(variants)):
+        image_path.unlink(missing_ok=True)
+        return _queue_full_response(scheduler.retry_after())
+
+    created_at = datetime.now().isoformat()
+    job_ids = [str(uuid.uuid4()) for _ in variants]
+    job_store.create(batch_id, {
+        "status": BATCH_STATUS,
+        "created_at": created_at,
+        "filename": image.filename,
+        "room_image": str(image_path),
+        "job_ids": job_ids,
+    })
+
+    # No awaits from here on, so the capacity checked above is still there
+    for job_id, params_dict in zip(job_ids, variants):
+        job_store.create(job_id, {
+            "status": "queued",
+            "stage": "queued",
+            "created_at": created_at,
+            "filename": image.filename,
+            "room_image": str(image_path),
+            "room_image_sha256": image_sha256,
+            "batch_id": batch_id,
+            "params": params_dict,
+        })
+        scheduler.submit(job_id, process_job, job_id, params_dict)
+
+    return {
+        "batch_id": batch_id,
+        "job_ids": job_ids,
+        "message": f"{len(job_ids)} jobs queued successfully",
+        "estimated_wait_seconds": scheduler.estimated_wait(scheduler.queued),
     }
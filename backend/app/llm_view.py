@@ -0,0 +1,128 @@
+"""
+Compact, versioned view of the catalog for the selection model, and the
+message layout that goes with it.
+
+The system message holds only the static instructions. The shortlisted
+candidates go in the user message as one pipe-separated table per category,
+with only the fields the model needs, followed by the budget and the user's
+words. The user message is kept under a token budget by dropping the lowest
+ranked candidates first.
+
+The instructions are well under OpenAI's 1024-token minimum for prompt
+caching, so no part of this prompt is served from the cache; it is kept
+small instead.
+
+Bump VIEW_VERSION whenever the instructions or the table format change; it
+is part of the selection cache key.
+"""
+from typing import Any, Dict, List
+
+from backend.app import config
+
+VIEW_VERSION = 2
+
+COLUMNS = ("id", "name", "type", "style", "color", "rooms", "ambiance", "features", "seats", "price_eur")
+
+INSTRUCTIONS = """You are an interior design expert. Select furniture from the candidates in the request that matches the user's request and budget. Choose at most one item per category, and only items listed as candidates.
+
+Rules:
+1. Match the user's style preferences.
+2. Keep the summed price_eur within the budget.
+3. Return ONLY valid JSON of exactly this shape, no markdown or other text:
+{"selected_items": [{"product_id": "<id>"}], "design_rationale": "<one sentence>"}
+
+Catalog columns: """ + "|".join(COLUMNS)
+
+
+def _clean(value: Any) -> str:
+    return str(value).replace("|", "/").replace("\n", " ").strip()
+
+
+def _price(value: float) -> str:
+    return f"{value:g}"
+
+
+def compact_row(record: Dict[str, Any]) -> str:
+    category = record.get("category", {})
+    meta = record.get("suitability_meta", {})
+    seats = meta.get("max_people_sofa") or ""
+    return "|".join(_clean(value) for value in (
+        record["product_id"],
+        record.get("product_name", ""),
+        category.get("sub", ""),
+        ",".join(category.get("style", [])),
+        record.get("physical_attributes", {}).get("color", ""),
+        ",".join(meta.get("room_type", [])),
+        ",".join(meta.get("ambiance", [])),
+        ",".join(meta.get("feature_tags", [])),
+        seats,
+        _price(record.get("pricing", {}).get("price", 0)),
+    ))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count; English text averages about four characters per token"""
+    return len(text) // 4 + 1
+
+
+def candidates_block(candidates: Dict[str, List[Dict[str, Any]]]) -> str:
+    """One table per category, categories sorted, rows in shortlist (rank) order"""
+    sections = []
+    for category in sorted(candidates):
+        rows = "\n".join(compact_row(record) for record in candidates[category]) or "(none)"
+        sections.append(f"## {category}\n{rows}")
+    return "\n".join(sections)
+
+
+class PromptTooLargeError(Exception):
+    pass
+
+
+class PromptLayout:
+    """Builds the selection messages, trimming candidates to fit max_tokens"""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+
+    @staticmethod
+    def system_message() -> str:
+        return INSTRUCTIONS
+
+    @staticmethod
+    def user_message(user_prompt: str, budget: float, candidates: Dict[str, List[Dict[str, Any]]]) -> str:
+        lines = [
+            "CANDIDATES:",
+            candidates_block(candidates),
+            f"BUDGET_EUR: {_price(budget)}",
+            # The user's own words go last
+            f"REQUEST: {user_prompt}",
+        ]
+        return "\n".join(lines)
+
+    def fit(self, user_prompt: str, budget: float, candidates: Dict[str, List[Dict[str, Any]]]) -> str:
+        """
+        The user message, after dropping the lowest ranked candidate of the
+        longest list until it fits. Every category keeps its best candidate;
+        raises PromptTooLargeError if even that does not fit.
+        """
+        candidates = {category: list(records) for category, records in candidates.items()}
+        budget_tokens = self.max_tokens - estimate_tokens(INSTRUCTIONS)
+        while True:
+            message = self.user_message(user_prompt, budget, candidates)
+            if estimate_tokens(message) <= budget_tokens:
+                return message
+            longest = max(candidates, key=lambda category: len(candidates[category]), default=None)
+            if longest is None or len(candidates[longest]) <= 1:
+                raise PromptTooLargeError(
+                    f"Selection prompt needs about {estimate_tokens(message)} tokens, budget {budget_tokens}"
+                )
+            candidates[longest].pop()
+
+    def messages(self, user_prompt: str, budget: float, candidates: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_message()},
+            {"role": "user", "content": self.fit(user_prompt, budget, candidates)},
+        ]
+
+
+prompt_layout = PromptLayout(config.selection_prompt_max_tokens)
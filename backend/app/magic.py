@@ -1,5 +1,4 @@
 import os
-from google import genai
 from PIL import Image
 from io import BytesIO
 from pathlib import Path
@@ -16,6 +15,8 @@ class NanoBananaGenerator:
             api_key: Google AI API key. If None, will try to read from GOOGLE_API_KEY env variable
         """
 
+        from google import genai
+
         self.client = genai.Client(api_key=config.google_api_key)
         self.model = "gemini-2.5-flash-image-preview"
 
@@ -81,13 +82,13 @@ class NanoBananaGenerator:
         return generated_image
 
 
+if __name__ == "__main__":
+    generator = NanoBananaGenerator()
 
-generator = NanoBananaGenerator()
-
-prompt1 = "Take the chair, and put 6 ot it in a dining layout in the room file I gave. I also added a nice lamp. put it also in the room. take also the sofa. make it front looking"
-image1 = generator.generate_image(
-    prompt=prompt1,
-    input_images= ["../chair.png", "../lamp.jpg" , "../sofa.png", "../livingRoom.jpg"],
-    output_path="output_living_room.png"
-)
-print("Example 1 completed\n")
+    prompt1 = "Take the chair, and put 6 ot it in a dining layout in the room file I gave. I also added a nice lamp. put it also in the room. take also the sofa. make it front looking"
+    image1 = generator.generate_image(
+        prompt=prompt1,
+        input_images= ["../chair.png", "../lamp.jpg" , "../sofa.png", "../livingRoom.jpg"],
+        output_path="output_living_room.png"
+    )
+    print("Example 1 completed\n")
@@ -1,11 +1,48 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.app import jobs
 from backend.app import health
+from backend.app.catalog import catalog
+from backend.app.vector_index import get_index
+from backend.app.scheduler import scheduler
+from backend.app import providers
+from backend.app.assets import product_images
+from backend.app import metrics
+from backend.app import config
+from backend.app.uploads import UploadSizeLimit
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse and index the furniture catalog once, before serving jobs
+    catalog.load()
+    catalog.start()
+    get_index()
+    # Decode and downscale product images in the background
+    warm_assets = asyncio.create_task(asyncio.to_thread(product_images.warm, [
+        record["product_id"] for records in catalog.inventory().values() for record in records
+    ]))
+    await providers.start()
+    health.start()
+    scheduler.start()
+    jobs.recover_jobs()
+    yield
+    await scheduler.stop()
+    await warm_assets
+    await health.stop()
+    await catalog.stop()
+    await providers.stop()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+
+# Oversized uploads are refused from their Content-Length, before the body is read
+app.add_middleware(UploadSizeLimit, max_bytes=config.max_upload_bytes)
 
 # Disable CORS
 app.add_middleware(
@@ -21,4 +58,10 @@ app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the best API in the world!"}
\ No newline at end of file
+    return {"message": "Welcome to the best API in the world!"}
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text format"""
+    body, content_type = metrics.render_latest()
+    return Response(body, media_type=content_type)
@@ -0,0 +1,130 @@
+"""
+Prometheus metrics, served on /metrics.
+
+Latencies and provider usage are recorded where they happen. Queue depth,
+cache hit ratios, job counts and provider resilience state already exist
+as stats() on their objects and are read at scrape time by _StateCollector.
+
+Metrics are per process; with several gunicorn workers each one is scraped
+separately.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from backend.app import config
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 240)
+
+# upload, inventory, selection, image_load, image_encode, render, save, variants
+stage_seconds = Histogram(
+    "furnish_stage_seconds",
+    "Time spent in each job pipeline stage",
+    ["stage"],
+    buckets=_SECONDS_BUCKETS,
+)
+queue_wait_seconds = Histogram(
+    "furnish_queue_wait_seconds",
+    "Time jobs wait in the queue before a worker picks them up",
+    buckets=_SECONDS_BUCKETS,
+)
+job_seconds = Histogram(
+    "furnish_job_seconds",
+    "Time from a worker picking up a job until it finishes",
+    buckets=_SECONDS_BUCKETS,
+)
+jobs_finished = Counter("furnish_jobs_finished_total", "Jobs that reached a final status", ["status"])
+
+openai_tokens = Counter("furnish_openai_tokens_total", "OpenAI tokens used for item selection", ["kind"])
+image_bytes = Counter("furnish_image_bytes_total", "Image bytes sent to and received from the image model", ["direction"])
+provider_cost = Counter("furnish_provider_cost_dollars_total", "Estimated provider spend in USD", ["provider"])
+
+
+def stage_timer(stage: str):
+    """with stage_timer("render"): ... records the block's duration"""
+    return stage_seconds.labels(stage=stage).time()
+
+
+def record_openai_usage(usage):
+    """Count tokens and estimated cost from a chat completion's usage"""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    uncached = usage.prompt_tokens - cached
+
+    openai_tokens.labels(kind="prompt").inc(usage.prompt_tokens)
+    openai_tokens.labels(kind="prompt_cached").inc(cached)
+    openai_tokens.labels(kind="completion").inc(usage.completion_tokens)
+    provider_cost.labels(provider="openai").inc((
+        uncached * config.openai_input_price
+        + cached * config.openai_cached_input_price
+        + usage.completion_tokens * config.openai_output_price
+    ) / 1_000_000)
+
+
+def record_render(sent: int, received: int):
+    image_bytes.labels(direction="sent").inc(sent)
+    image_bytes.labels(direction="received").inc(received)
+    provider_cost.labels(provider="genai").inc(config.genai_image_price)
+
+
+class _StateCollector:
+    """Reads the current state of the scheduler, caches and providers on every scrape"""
+
+    def describe(self):
+        # Nothing to check up front, and collect() cannot run at import time
+        return []
+
+    def collect(self):
+        # Imported here: these modules record into the metrics above
+        from backend.app.assets import product_images
+        from backend.app.events import job_events
+        from backend.app.job_store import job_store
+        from backend.app.render_cache import render_cache
+        from backend.app.resilience import genai_policy, openai_policy
+        from backend.app.scheduler import scheduler
+        from backend.app.selection_cache import selection_cache
+
+        yield GaugeMetricFamily("furnish_queue_depth", "Jobs waiting for a worker", value=scheduler.queued)
+        yield GaugeMetricFamily("furnish_jobs_in_flight", "Jobs being processed", value=scheduler.running)
+        yield GaugeMetricFamily("furnish_sse_subscribers", "Open job event streams", value=job_events.subscriber_count)
+
+        jobs = GaugeMetricFamily("furnish_jobs", "Stored jobs by status", labels=["status"])
+        for status, count in job_store.count_by_status().items():
+            jobs.add_metric([status], count)
+        yield jobs
+
+        hits = CounterMetricFamily("furnish_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("furnish_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("furnish_cache_hit_ratio", "Cache hits over lookups since start", labels=["cache"])
+        for name, cache in (("selection", selection_cache), ("render", render_cache), ("product_image", product_images)):
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats["hit_ratio"])
+        yield hits
+        yield misses
+        yield ratio
+
+        calls = CounterMetricFamily("furnish_provider_calls", "Provider calls", labels=["provider"])
+        retries = CounterMetricFamily("furnish_provider_retries", "Retried provider attempts", labels=["provider"])
+        hedges = CounterMetricFamily("furnish_provider_hedges", "Hedged duplicate requests", labels=["provider"])
+        failures = CounterMetricFamily("furnish_provider_failures", "Provider calls that failed after retries", labels=["provider"])
+        rejected = CounterMetricFamily("furnish_provider_rejected", "Calls rejected by an open circuit", labels=["provider"])
+        circuit_open = GaugeMetricFamily("furnish_provider_circuit_open", "1 while the circuit is open", labels=["provider"])
+        for policy in (openai_policy, genai_policy):
+            stats = policy.stats()
+            calls.add_metric([policy.name], stats["calls"])
+            retries.add_metric([policy.name], stats["retries"])
+            hedges.add_metric([policy.name], stats["hedges"])
+            failures.add_metric([policy.name], stats["failures"])
+            rejected.add_metric([policy.name], stats["rejected"])
+            circuit_open.add_metric([policy.name], 1 if stats["circuit"] == "open" else 0)
+        yield from (calls, retries, hedges, failures, rejected, circuit_open)
+
+
+REGISTRY.register(_StateCollector())
+
+
+def render_latest():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
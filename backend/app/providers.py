@@ -0,0 +1,118 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+import httpx
+
+from backend.app import config
+
+if TYPE_CHECKING:
+    from google import genai
+    from openai import AsyncOpenAI
+
+# Long-lived provider clients, created once and shared by every job so
+# connections (and TLS sessions) are reused across requests. SDK retries are
+# off; resilience.py retries instead.
+#
+# The SDKs take over a second to import, so importing this module does not
+# load them: start() imports them on a worker thread after the app is up and
+# ready() waits for that before the first provider call.
+_openai_client = None
+_genai_client = None
+_http_clients = []
+_slots = {}
+_sdk_task = None
+
+
+def _http_client() -> httpx.AsyncClient:
+    client = httpx.AsyncClient(
+        http2=config.provider_http2,
+        limits=httpx.Limits(
+            max_connections=config.provider_max_connections,
+            max_keepalive_connections=config.provider_max_keepalive,
+            keepalive_expiry=config.provider_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(config.provider_timeout, connect=config.provider_connect_timeout),
+    )
+    _http_clients.append(client)
+    return client
+
+
+def load_sdks():
+    """Import the provider SDKs; blocking, so run it off the event loop"""
+    import openai  # noqa: F401
+    from google import genai  # noqa: F401
+
+
+def openai_client() -> "AsyncOpenAI":
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            base_url=config.openai_base_url,
+            http_client=_http_client(),
+            max_retries=0,
+        )
+    return _openai_client
+
+
+def genai_client() -> "genai.Client":
+    global _genai_client
+    if _genai_client is None:
+        from google import genai
+        from google.genai import types
+
+        _genai_client = genai.Client(
+            api_key=config.google_api_key,
+            http_options=types.HttpOptions(
+                base_url=config.genai_base_url,
+                httpx_async_client=_http_client(),
+                retry_options=types.HttpRetryOptions(attempts=1),
+            ),
+        )
+    return _genai_client
+
+
+def slots(provider: str) -> asyncio.Semaphore:
+    """Semaphore bounding concurrent calls to provider ("openai" or "genai")"""
+    if provider not in _slots:
+        limits = {"openai": config.openai_concurrency, "genai": config.genai_concurrency}
+        _slots[provider] = asyncio.Semaphore(limits[provider])
+    return _slots[provider]
+
+
+async def _load():
+    await asyncio.to_thread(load_sdks)
+    # A missing key should fail the jobs that need it, not the whole app
+    for create in (openai_client, genai_client):
+        try:
+            create()
+        except Exception as e:
+            print(f"Warning: could not create {create.__name__}: {e}")
+
+
+async def start():
+    """Load the SDKs and create the clients in the background"""
+    global _sdk_task
+    if _sdk_task is None:
+        _sdk_task = asyncio.create_task(_load(), name="provider-sdks")
+
+
+async def ready():
+    """Wait until the SDKs are loaded; call before the first provider call"""
+    await start()
+    await _sdk_task
+
+
+async def stop():
+    global _openai_client, _genai_client, _sdk_task
+    if _sdk_task is not None:
+        await asyncio.gather(_sdk_task, return_exceptions=True)
+        _sdk_task = None
+    for client in _http_clients:
+        await client.aclose()
+    _http_clients.clear()
+    _slots.clear()
+    _openai_client = None
+    _genai_client = None
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from backend.app import config
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed store of generated room images.
+
+    A render is identified by the hash of the uploaded room photo, the sorted
+    product ids and the exact prompt, so byte-identical jobs reuse the stored
+    PNG instead of calling the image model again.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(room_image_sha256: str, product_ids: Iterable[str], prompt: str, model: str) -> str:
+        digest = hashlib.sha256()
+        for part in (room_image_sha256, ",".join(sorted(product_ids)), model, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        with self._lock:
+            if path.exists():
+                self.hits += 1
+                return path
+            self.misses += 1
+            return None
+
+    def put(self, key: str, source: str) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / total if total else 0.0}
+
+
+render_cache = RenderCache(config.cache_dir / "renders")
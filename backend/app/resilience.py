@@ -0,0 +1,246 @@
+"""
+Deadlines, retries, hedging and circuit breaking for provider calls.
+
+Each provider gets one Policy. Policy.call(fn) runs the coroutine function
+fn under an overall deadline. Every attempt gets its own timeout. Retryable
+errors are retried with full-jitter exponential backoff. A duplicate
+("hedged") request can be sent once an attempt is slower than the recent
+p95. After enough consecutive retryable failures the circuit opens, and
+calls fail immediately until reset_timeout has passed and a single trial
+call has succeeded.
+
+The SDK clients are created with their own retries disabled, so this is the
+only retry layer.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from backend.app import config, providers
+
+T = TypeVar("T")
+
+# HTTP statuses worth another attempt: timeouts, rate limits, server errors
+_RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable, not retrying for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transport errors, timeouts and retryable HTTP statuses from either SDK"""
+    if isinstance(error, (TimeoutError, httpx.TransportError)):
+        return True
+    # openai.APIStatusError has status_code, google.genai.errors.APIError has code
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUSES
+    # openai.APIConnectionError / APITimeoutError carry no status
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+class LatencyTracker:
+    """Recent successful call durations, for the hedging delay"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. Once reset_timeout has
+    passed it is half-open: exactly one trial call goes through, the others are
+    rejected until that call has succeeded (closed) or failed (open again).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def check(self, name: str) -> bool:
+        """Raises CircuitOpenError unless the call may go ahead; True if it is the half-open trial"""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "open":
+            raise CircuitOpenError(name, self.reset_timeout - (time.monotonic() - self._opened_at))
+        if self._trial:
+            # At worst the trial fails and opens the circuit for another reset_timeout
+            raise CircuitOpenError(name, self.reset_timeout)
+        self._trial = True
+        return True
+
+    def end_trial(self):
+        self._trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        # A failed half-open trial opens the circuit for another reset_timeout
+        if self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class Policy:
+    def __init__(
+            self,
+            name: str,
+            deadline: float,
+            attempt_timeout: float,
+            max_attempts: int = 3,
+            base_delay: float = 0.5,
+            max_delay: float = 8.0,
+            hedge: bool = False,
+            breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform between 0 and the exponential cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], timeout: float) -> T:
+        hedge_delay = self.latency.percentile(0.95) if self.hedge else None
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await asyncio.wait_for(fn(), timeout)
+
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            async with asyncio.timeout(timeout):
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                # Never hedge into a saturated provider, it would only add load
+                if not done and not providers.slots(self.name).locked():
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(fn()))
+
+                # First success wins; fail only when every request has failed
+                pending = set(tasks)
+                error = None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        error = task.exception()
+                raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() with this policy; fn must create a new request on every call"""
+        self.calls += 1
+        try:
+            trial = self.breaker.check(self.name)
+        except CircuitOpenError:
+            self.rejected += 1
+            raise
+
+        try:
+            return await self._call(fn)
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    async def _call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            started = time.monotonic()
+            try:
+                result = await self._attempt(fn, min(self.attempt_timeout, remaining))
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered (bad request, auth, content policy):
+                    # it is reachable, so this counts as a success for the circuit
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+
+                attempt += 1
+                delay = self._backoff(attempt)
+                if attempt >= self.max_attempts or self.breaker.state == "open" or time.monotonic() + delay >= deadline:
+                    self.failures += 1
+                    raise
+                print(f"{self.name} call failed ({type(e).__name__}: {e}), retry {attempt} in {delay:.1f}s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.latency.add(time.monotonic() - started)
+            self.breaker.record_success()
+            return result
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "circuit": self.breaker.state,
+            "p95_seconds": self.latency.percentile(0.95),
+        }
+
+
+def _policy(name: str, deadline: float, attempt_timeout: float, hedge: bool) -> Policy:
+    return Policy(
+        name,
+        deadline=deadline,
+        attempt_timeout=attempt_timeout,
+        max_attempts=config.provider_max_attempts,
+        base_delay=config.provider_retry_base_delay,
+        max_delay=config.provider_retry_max_delay,
+        hedge=hedge,
+        breaker=CircuitBreaker(config.circuit_failure_threshold, config.circuit_reset_timeout),
+    )
+
+
+openai_policy = _policy("openai", config.openai_deadline, config.openai_attempt_timeout, config.openai_hedge)
+genai_policy = _policy("genai", config.genai_deadline, config.genai_attempt_timeout, config.genai_hedge)
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, features
+
+from backend.app import config
+
+# variant name -> (file suffix, media type)
+VARIANTS = {
+    "png": (".png", "image/png"),
+    "webp": (".webp", "image/webp"),
+    "avif": (".avif", "image/avif"),
+    "thumb": (".thumb.webp", "image/webp"),
+}
+
+
+class ResultsStore:
+    """
+    Generated room images, one file per job and variant. The lossless PNG is
+    what the image model produced; the WebP is derived from it before the job
+    is reported done, the slower AVIF and the small WebP thumbnail right after.
+    """
+
+    def __init__(self, directory: Path, quality: int = 82, avif_quality: int = 60, thumbnail_edge: int = 320):
+        self.directory = Path(directory)
+        self.quality = quality
+        self.avif_quality = avif_quality
+        self.thumbnail_edge = thumbnail_edge
+
+    def path_for(self, job_id: str, variant: str = "png") -> Path:
+        return self.directory / f"{job_id}{VARIANTS[variant][0]}"
+
+    def create_webp(self, job_id: str):
+        with Image.open(self.path_for(job_id)) as image:
+            self._save(image.convert("RGB"), job_id, "webp", format="WEBP", quality=self.quality, method=4)
+
+    def create_variants(self, job_id: str):
+        """AVIF (where Pillow supports it) and the thumbnail"""
+        with Image.open(self.path_for(job_id)) as image:
+            image = image.convert("RGB")
+            if features.check("avif"):
+                self._save(image, job_id, "avif", format="AVIF", quality=self.avif_quality, speed=8)
+
+            image.thumbnail((self.thumbnail_edge, self.thumbnail_edge), Image.Resampling.LANCZOS)
+            self._save(image, job_id, "thumb", format="WEBP", quality=self.quality)
+
+    def _save(self, image: Image.Image, job_id: str, variant: str, **options):
+        path = self.path_for(job_id, variant)
+        tmp_path = Path(f"{path}.tmp")
+        image.save(tmp_path, **options)
+        os.replace(tmp_path, path)
+
+    def best_variant(self, job_id: str, accept: str) -> Optional[str]:
+        """Smallest full-size variant the client accepts that exists on disk"""
+        sizes = {}
+        for variant in ("png", "webp", "avif"):
+            if variant != "png" and VARIANTS[variant][1] not in accept:
+                continue
+            try:
+                sizes[variant] = self.path_for(job_id, variant).stat().st_size
+            except FileNotFoundError:
+                pass
+        return min(sizes, key=sizes.get) if sizes else None
+
+
+results_store = ResultsStore(
+    config.results_dir,
+    config.results_quality,
+    config.results_avif_quality,
+    config.results_thumbnail_edge,
+)
@@ -0,0 +1,108 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app import config
+from backend.app import metrics
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """
+    Fixed number of asyncio worker tasks fed from a bounded FIFO queue.
+
+    Jobs are coroutine functions, so a worker waiting on a provider call holds
+    no thread. Submissions beyond max_queue are rejected with QueueFullError
+    instead of piling up, and the average job duration is tracked so callers
+    can be told how long a queued job will wait.
+    """
+
+    def __init__(self, workers: int = 64, max_queue: int = 256, initial_duration: float = 30.0):
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._pending = deque()
+        self._available: Optional[asyncio.Semaphore] = None
+        self._tasks = []
+        self._running = 0
+
+        # Exponentially weighted moving average of job run time
+        self.average_duration = initial_duration
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._available = asyncio.Semaphore(len(self._pending))
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._available = None
+
+    def has_capacity(self, count: int = 1) -> bool:
+        return len(self._pending) + count <= self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up"""
+        return max(1, math.ceil(self.average_duration / self.workers))
+
+    def submit(self, job_id: str, fn: Callable[..., Awaitable[Any]], *args) -> int:
+        """Queue fn(*args); returns the 1-based queue position"""
+        if len(self._pending) >= self.max_queue:
+            raise QueueFullError(self.retry_after())
+        self._pending.append((job_id, fn, args, time.monotonic()))
+        if self._available is not None:
+            self._available.release()
+        return len(self._pending)
+
+    def position(self, job_id: str) -> Optional[int]:
+        for i, (pending_id, _, _, _) in enumerate(self._pending):
+            if pending_id == job_id:
+                return i + 1
+        return None
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds before the job at this queue position starts running"""
+        return round(math.ceil(position / self.workers) * self.average_duration, 1)
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    async def _work(self):
+        while True:
+            await self._available.acquire()
+            job_id, fn, args, queued_at = self._pending.popleft()
+            self._running += 1
+
+            started = time.monotonic()
+            metrics.queue_wait_seconds.observe(started - queued_at)
+            try:
+                await fn(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job {job_id} crashed in scheduler: {e}")
+            finally:
+                self._running -= 1
+                duration = time.monotonic() - started
+                metrics.job_seconds.observe(duration)
+                self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+
+
+scheduler = JobScheduler(config.job_workers, config.job_queue_size, config.job_duration_estimate)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from backend.app import config
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, punctuation and whitespace do not change the selection"""
+    return " ".join(_WORD.findall(prompt.lower()))
+
+
+def budget_bucket(budget: float, step: float) -> int:
+    return int(math.floor(budget / step))
+
+
+class SelectionCache:
+    """
+    Two-tier cache of model furniture selections.
+
+    An in-memory LRU sits in front of a SQLite file so that entries survive
+    restarts. Entries expire after ttl seconds in both tiers; expired rows
+    are deleted when the file is opened and then every purge_every writes.
+    get and put block on SQLite, so async code calls them in a thread.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 1024, ttl: float = 7 * 24 * 3600, purge_every: int = 256):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._writes = 0
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def selection_key(self, user_prompt: str, budget: float, catalog_version: str, mode: str = "llm") -> str:
+        return self.key(
+            normalize_prompt(user_prompt),
+            budget_bucket(budget, config.selection_cache_budget_step),
+            catalog_version,
+            mode,
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS selections (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS selections_created_at ON selections (created_at)")
+            self._purge(self._db)
+            self._db.commit()
+        return self._db
+
+    def _purge(self, db: sqlite3.Connection):
+        db.execute("DELETE FROM selections WHERE created_at < ?", (time.time() - self.ttl,))
+
+    def _remember(self, key: str, value: Any, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            row = self._connection().execute(
+                "SELECT value, created_at FROM selections WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self._memory.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO selections (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._purge(db)
+            db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+selection_cache = SelectionCache(
+    config.cache_dir / "selections.sqlite3",
+    config.selection_cache_size,
+    config.selection_cache_ttl,
+)
@@ -0,0 +1,74 @@
+import re
+from typing import Any, Dict, List, Optional, Set
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {
+    "a", "an", "and", "the", "with", "for", "of", "in", "on", "to", "my", "me",
+    "i", "is", "it", "make", "want", "like", "room", "design", "style", "some",
+}
+
+# How much a prompt word counts when it hits each catalog field
+_FIELD_WEIGHTS = (
+    (("category", "style"), 2.0),
+    (("suitability_meta", "ambiance"), 1.0),
+    (("suitability_meta", "room_type"), 1.0),
+    (("suitability_meta", "feature_tags"), 1.0),
+)
+
+
+def tokenize(text: str) -> Set[str]:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def _field_terms(record: Dict[str, Any], section: str, field: str) -> Set[str]:
+    terms = set()
+    for value in record.get(section, {}).get(field, []):
+        terms |= tokenize(value)
+    return terms
+
+
+def price_of(record: Dict[str, Any]) -> float:
+    return record.get("pricing", {}).get("price", 0)
+
+
+def score_item(record: Dict[str, Any], prompt_terms: Set[str]) -> float:
+    """Weighted overlap between the prompt words and the item's style tags"""
+    score = 0.0
+    for (section, field), weight in _FIELD_WEIGHTS:
+        score += weight * len(prompt_terms & _field_terms(record, section, field))
+    return score
+
+
+def shortlist(
+        inventory: Dict[str, List[Dict[str, Any]]],
+        user_prompt: str,
+        max_price: Optional[float] = None,
+        top_k: int = 8,
+        semantic_scores: Optional[Dict[str, float]] = None,
+        semantic_weight: float = 0.0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Deterministic candidate shortlist sent to the selection model.
+
+    Drops items priced above max_price, ranks the rest by prompt overlap
+    (cheaper first, then product_id, on ties) and keeps the top_k per category.
+    semantic_scores (product_id -> similarity) are added with semantic_weight.
+    """
+    prompt_terms = tokenize(user_prompt)
+    semantic_scores = semantic_scores or {}
+    result = {}
+
+    def rank(record):
+        score = score_item(record, prompt_terms) + semantic_weight * semantic_scores.get(record["product_id"], 0.0)
+        return -score, price_of(record), record["product_id"]
+
+    for category, records in inventory.items():
+        candidates = [
+            record for record in records
+            if max_price is None or price_of(record) <= max_price
+        ]
+        candidates.sort(key=rank)
+        result[category] = candidates[:top_k]
+
+    return result
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.app.shortlist import price_of, score_item, tokenize
+
+# Leaving a category empty costs more than any achievable relevance score,
+# so the solver only does it when no item of that category fits the budget.
+_SKIP_PENALTY = 1_000_000.0
+
+# Bonus that makes repair keep as many of the model's own picks as possible
+_KEEP_BONUS = 1_000.0
+
+
+def _cents(price: float) -> int:
+    return int(round(price * 100))
+
+
+def solve(
+        options: Dict[str, Sequence[Tuple[Dict[str, Any], float]]],
+        budget: float,
+) -> List[Dict[str, Any]]:
+    """
+    Multiple-choice knapsack: pick at most one record per category, maximizing
+    the summed score with the summed price at or under budget.
+
+    options maps category -> [(record, score)]. Works on a Pareto frontier of
+    (cost, score) states, so it is exact and its size is bounded by the number
+    of distinct reachable costs rather than by the budget.
+    """
+    limit = _cents(budget)
+    # (cost in cents, score, picked records)
+    frontier: List[Tuple[int, float, Tuple[Dict[str, Any], ...]]] = [(0, 0.0, ())]
+
+    for category in sorted(options):
+        expanded = []
+        for cost, score, picks in frontier:
+            expanded.append((cost, score - _SKIP_PENALTY, picks))
+            for record, item_score in options[category]:
+                item_cost = cost + _cents(price_of(record))
+                if item_cost <= limit:
+                    expanded.append((item_cost, score + item_score, picks + (record,)))
+
+        # Keep only states that beat every cheaper state
+        expanded.sort(key=lambda state: (state[0], -state[1]))
+        frontier = []
+        for state in expanded:
+            if not frontier or state[1] > frontier[-1][1]:
+                frontier.append(state)
+
+    best = max(frontier, key=lambda state: (state[1], -state[0]))
+    return list(best[2])
+
+
+def _options(
+        inventory: Dict[str, List[Dict[str, Any]]],
+        user_prompt: str,
+        semantic_scores: Optional[Dict[str, float]] = None,
+        semantic_weight: float = 0.0,
+        preferred: Sequence[str] = (),
+) -> Dict[str, List[Tuple[Dict[str, Any], float]]]:
+    prompt_terms = tokenize(user_prompt)
+    semantic_scores = semantic_scores or {}
+    preferred = set(preferred)
+
+    options = {}
+    for category, records in inventory.items():
+        options[category] = [
+            (
+                record,
+                # +1 so that any item is preferred to an empty slot of equal cost
+                1.0
+                + score_item(record, prompt_terms)
+                + semantic_weight * semantic_scores.get(record["product_id"], 0.0)
+                + (_KEEP_BONUS if record["product_id"] in preferred else 0.0),
+            )
+            for record in records
+        ]
+    return options
+
+
+def select_items(
+        inventory: Dict[str, List[Dict[str, Any]]],
+        user_prompt: str,
+        budget: float,
+        semantic_scores: Optional[Dict[str, float]] = None,
+        semantic_weight: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """Best-scoring one-item-per-category selection within budget"""
+    return solve(_options(inventory, user_prompt, semantic_scores, semantic_weight), budget)
+
+
+def repair(
+        selected: List[Dict[str, Any]],
+        inventory: Dict[str, List[Dict[str, Any]]],
+        user_prompt: str,
+        budget: float,
+        semantic_scores: Optional[Dict[str, float]] = None,
+        semantic_weight: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Return selected unchanged if it fits the budget, otherwise the in-budget
+    selection that keeps as many of the selected items as possible.
+    """
+    if sum(price_of(record) for record in selected) <= budget:
+        return selected
+
+    preferred = [record["product_id"] for record in selected]
+    return solve(_options(inventory, user_prompt, semantic_scores, semantic_weight, preferred), budget)
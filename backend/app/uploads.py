@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+from typing import BinaryIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.responses import JSONResponse
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Multipart boundaries, part headers and the params field around the image
+_FORM_OVERHEAD = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+def store_upload(source: BinaryIO, destination: Path, max_bytes: int) -> int:
+    """
+    Copy an uploaded file to disk in fixed-size chunks, so memory use does not
+    depend on the upload size. Returns the number of bytes written.
+    """
+    written = 0
+    try:
+        with open(destination, "wb") as f:
+            for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLargeError(f"Upload is larger than {max_bytes} bytes")
+                f.write(chunk)
+    except BaseException:
+        Path(destination).unlink(missing_ok=True)
+        raise
+    return written
+
+
+def normalize_room_image(source: Path, destination: Path, max_edge: int, quality: int):
+    """
+    Apply the EXIF orientation, downscale to max_edge and re-encode as JPEG.
+    The normalized image replaces the raw upload.
+    """
+    tmp_path = Path(f"{destination}.tmp")
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGB")
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            image.save(tmp_path, format="JPEG", quality=quality, optimize=True)
+        os.replace(tmp_path, destination)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        tmp_path.unlink(missing_ok=True)
+        raise InvalidImageError(f"Could not read the uploaded image: {e}")
+    finally:
+        if Path(source) != Path(destination):
+            Path(source).unlink(missing_ok=True)
+
+
+def save_room_image(source: BinaryIO, destination: Path, max_bytes: int, max_edge: int, quality: int):
+    """Stream the upload to disk next to destination, then normalize it in place"""
+    raw_path = Path(f"{destination}.upload")
+    store_upload(source, raw_path, max_bytes)
+    normalize_room_image(raw_path, destination, max_edge, quality)
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware answering 413 to requests whose Content-Length is over
+    the upload limit, before any of the body is received or spooled.
+    Chunked uploads have no length up front; store_upload still caps those.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_body = max_bytes + _FORM_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_body:
+                        response = JSONResponse(
+                            status_code=413,
+                            content={"error": f"Image is larger than {self.max_bytes // (1024 * 1024)} MB"},
+                            headers={"Connection": "close"},
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
@@ -0,0 +1,212 @@
+"""
+Local semantic index over the furniture catalog.
+
+The index is built offline from every catalog record and stored next to the
+category files as a float32 matrix (`<name>.npy`, opened memory-mapped) plus a
+JSON sidecar with the product ids and embedder state. Queries are a single
+matrix-vector product, so they never touch the network.
+
+Build it with:
+
+    python -m backend.app.vector_index [--backend auto|model|tfidf]
+"""
+import argparse
+import json
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app import config
+from backend.app.catalog import catalog
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def record_text(record: Dict[str, Any]) -> str:
+    """Text that represents a catalog record in the index"""
+    meta = record.get("suitability_meta", {})
+    parts = [record.get("product_name", ""), record.get("description", "")]
+    for field in ("ambiance", "room_type", "feature_tags"):
+        parts.extend(meta.get(field, []))
+    return " ".join(parts)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class TfidfEmbedder:
+    """Dependency-free fallback: L2-normalized TF-IDF over the most frequent words"""
+
+    name = "tfidf"
+
+    def __init__(self, vocabulary: Dict[str, int] = None, idf: List[float] = None):
+        self.vocabulary = vocabulary or {}
+        self.idf = np.asarray(idf or [], dtype=np.float32)
+
+    @staticmethod
+    def _words(text: str) -> List[str]:
+        return _WORD.findall(text.lower())
+
+    def fit(self, texts: List[str], max_features: int = 4096):
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(self._words(text)))
+
+        terms = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:max_features]
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        n = len(texts)
+        self.idf = np.asarray(
+            [math.log((1 + n) / (1 + document_frequency[term])) + 1 for term in terms],
+            dtype=np.float32,
+        )
+        return self
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term, count in Counter(self._words(text)).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    matrix[row, column] = count
+        return _normalize_rows(matrix * self.idf)
+
+    def state(self) -> Dict[str, Any]:
+        return {"vocabulary": self.vocabulary, "idf": self.idf.tolist()}
+
+
+class ModelEmbedder:
+    """Local sentence-transformers model, loaded from disk only"""
+
+    name = "model"
+
+    def __init__(self, model_name: str):
+        # Optional dependency, only needed when the index was built with a model
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, local_files_only=True)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+    def state(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+
+def _create_embedder(backend: str, texts: List[str]):
+    if backend in ("auto", "model"):
+        try:
+            return ModelEmbedder(config.embedding_model)
+        except Exception as e:
+            if backend == "model":
+                raise
+            print(f"Embedding model unavailable ({e}), falling back to TF-IDF")
+    return TfidfEmbedder().fit(texts)
+
+
+class VectorIndex:
+    def __init__(self, matrix: np.ndarray, product_ids: List[str], embedder, fingerprint: str = ""):
+        self.matrix = matrix
+        self.product_ids = product_ids
+        self.embedder = embedder
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, inventory: Dict[str, List[Dict[str, Any]]], backend: str = "auto", fingerprint: str = ""):
+        records = [record for records in inventory.values() for record in records]
+        texts = [record_text(record) for record in records]
+        embedder = _create_embedder(backend, texts)
+        return cls(embedder.embed(texts), [record["product_id"] for record in records], embedder, fingerprint)
+
+    def save(self, path: Path):
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), self.matrix)
+        meta = {
+            "backend": self.embedder.name,
+            "fingerprint": self.fingerprint,
+            "product_ids": self.product_ids,
+            "embedder": self.embedder.state(),
+        }
+        with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: Path):
+        path = Path(path)
+        with open(path.with_suffix(".json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        state = meta["embedder"]
+        if meta["backend"] == "model":
+            embedder = ModelEmbedder(state["model_name"])
+        else:
+            embedder = TfidfEmbedder(state["vocabulary"], state["idf"])
+
+        matrix = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        return cls(matrix, meta["product_ids"], embedder, meta.get("fingerprint", ""))
+
+    def query(self, text: str, k: int = 50) -> List[Tuple[str, float]]:
+        """Top-k (product_id, cosine similarity) pairs, best first"""
+        if not self.product_ids:
+            return []
+
+        scores = self.matrix @ self.embedder.embed([text])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.product_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+_index_missing = False
+
+
+def get_index() -> Optional[VectorIndex]:
+    """The on-disk index, loaded once per process; None when it has not been built"""
+    global _index, _index_missing
+    if _index is not None or _index_missing:
+        return _index
+
+    with _index_lock:
+        if _index is None and not _index_missing:
+            try:
+                _index = VectorIndex.load(config.vector_index_path)
+                if catalog.fingerprint and _index.fingerprint != catalog.fingerprint:
+                    print("Warning: vector index was built from a different catalog version, rebuild it")
+            except FileNotFoundError:
+                print(f"Warning: no vector index at {config.vector_index_path}, semantic retrieval disabled")
+                _index_missing = True
+            except Exception as e:
+                print(f"Warning: could not load vector index: {e}")
+                _index_missing = True
+    return _index
+
+
+def semantic_scores(text: str, k: int = 50) -> Dict[str, float]:
+    """product_id -> similarity for the k closest products, empty without an index"""
+    index = get_index()
+    if index is None:
+        return {}
+    return dict(index.query(text, k))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local catalog vector index")
+    parser.add_argument("--backend", choices=["auto", "model", "tfidf"], default="auto")
+    parser.add_argument("--output", default=str(config.vector_index_path))
+    args = parser.parse_args()
+
+    catalog.load()
+    index = VectorIndex.build(catalog.inventory(), args.backend, catalog.fingerprint)
+    index.save(Path(args.output))
+    print(f"Indexed {len(index.product_ids)} products with {index.embedder.name} ({index.matrix.shape[1]} dims) -> {args.output}")
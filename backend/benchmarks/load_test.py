@@ -0,0 +1,277 @@
+"""
+Offline load test of the job pipeline.
+
+Starts the provider stubs and the backend as separate processes (no
+network, no API keys), submits --jobs jobs to /jobs/generate with at most
+--concurrency in flight, follows each over /jobs/events and reports
+throughput, end-to-end latency percentiles and the backend's memory use.
+
+    python -m backend.benchmarks.load_test --jobs 200 --concurrency 50 --genai-latency 8
+
+Run it from the repository root. Use --url to drive an already running
+backend instead; it must have been started with OPENAI_BASE_URL and
+GENAI_BASE_URL pointing at the stubs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from backend.benchmarks.stub_providers import add_arguments
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+_STYLES = ["cozy scandinavian", "industrial loft", "modern minimalist", "warm boho", "classic elegant", "bright coastal"]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def memory_kib(pid: int) -> dict:
+    """Current and peak resident memory of pid, from /proc (Linux only)"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+def _start(command: List[str], env: dict) -> subprocess.Popen:
+    # The backend prints a few lines per job; only errors are of interest here
+    return subprocess.Popen(command, cwd=_ROOT, env=env, stdout=subprocess.DEVNULL)
+
+
+def stage_means(metrics_text: str) -> dict:
+    """Mean seconds per pipeline stage from the backend's /metrics output"""
+    sums, counts = {}, {}
+    for line in metrics_text.splitlines():
+        for suffix, target in (("_sum", sums), ("_count", counts)):
+            prefix = f"furnish_stage_seconds{suffix}{{stage=\""
+            if line.startswith(prefix):
+                stage = line[len(prefix):line.index('"', len(prefix))]
+                target[stage] = float(line.rsplit(" ", 1)[1])
+    return {stage: round(sums[stage] / counts[stage], 3) for stage in sums if counts.get(stage)}
+
+
+def openai_tokens(metrics_text: str) -> dict:
+    """Prompt, cached prompt and completion token totals from /metrics"""
+    prefix = 'furnish_openai_tokens_total{kind="'
+    return {
+        line[len(prefix):line.index('"', len(prefix))]: int(float(line.rsplit(" ", 1)[1]))
+        for line in metrics_text.splitlines()
+        if line.startswith(prefix)
+    }
+
+
+async def _wait_until_up(client: httpx.AsyncClient, url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def _run_job(client: httpx.AsyncClient, base_url: str, image: bytes, params: dict, stats: dict):
+    started = time.monotonic()
+
+    # Back off as the server asks when the queue is full
+    while True:
+        response = await client.post(
+            f"{base_url}/jobs/generate",
+            files={"image": ("room.jpg", image, "image/jpeg")},
+            data={"params": json.dumps(params)},
+        )
+        if response.status_code != 429:
+            break
+        stats["rejected"] += 1
+        await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+
+    if response.status_code != 200:
+        stats["errors"].append(f"submit {response.status_code}: {response.text[:200]}")
+        return
+
+    job_id = response.json()["job_id"]
+    async with client.stream("GET", f"{base_url}/jobs/events/{job_id}") as events:
+        async for line in events.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["stage"] == "done":
+                stats["latencies"].append(time.monotonic() - started)
+                return
+            if event["stage"] == "failed":
+                stats["errors"].append(f"job {job_id}: {event.get('error')}")
+                return
+    stats["errors"].append(f"job {job_id}: event stream ended early")
+
+
+async def drive(base_url: str, jobs: int, concurrency: int, image: bytes, budget: float,
+                selection_mode: str, repeat_prompts: bool, backend_pid: Optional[int]) -> dict:
+    stats = {"latencies": [], "errors": [], "rejected": 0, "peak_rss_kib": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(600.0), limits=limits) as client:
+        await _wait_until_up(client, f"{base_url}/health/live")
+
+        async def one(i: int):
+            # Distinct prompts by default, so the selection and render caches do not hide the provider cost
+            prompt = random.choice(_STYLES) if repeat_prompts else f"{_STYLES[i % len(_STYLES)]} room variant {i}"
+            params = {"prompt": prompt, "max_price": budget, "selection_mode": selection_mode}
+            async with semaphore:
+                await _run_job(client, base_url, image, params, stats)
+
+        async def sample_memory():
+            while True:
+                rss = memory_kib(backend_pid).get("VmRSS", 0)
+                stats["peak_rss_kib"] = max(stats["peak_rss_kib"], rss)
+                await asyncio.sleep(0.5)
+
+        sampler = asyncio.create_task(sample_memory()) if backend_pid else None
+        started = time.monotonic()
+        await asyncio.gather(*(one(i) for i in range(jobs)))
+        stats["wall_seconds"] = time.monotonic() - started
+        if sampler:
+            sampler.cancel()
+            stats["backend_memory_kib"] = memory_kib(backend_pid)
+
+        metrics_text = (await client.get(f"{base_url}/metrics")).text
+        stats["stage_means"] = stage_means(metrics_text)
+        stats["openai_tokens"] = openai_tokens(metrics_text)
+
+    return stats
+
+
+def report(stats: dict, jobs: int) -> dict:
+    latencies = stats["latencies"]
+    summary = {
+        "jobs": jobs,
+        "completed": len(latencies),
+        "failed": len(stats["errors"]),
+        "rejected_429": stats["rejected"],
+        "wall_seconds": round(stats["wall_seconds"], 2),
+        "throughput_jobs_per_second": round(len(latencies) / stats["wall_seconds"], 2) if stats["wall_seconds"] else 0,
+        "latency_seconds": {
+            name: round(value, 3) if value is not None else None
+            for name, value in (
+                ("p50", percentile(latencies, 0.50)),
+                ("p95", percentile(latencies, 0.95)),
+                ("p99", percentile(latencies, 0.99)),
+                ("max", max(latencies) if latencies else None),
+            )
+        },
+        "backend_peak_rss_mib": round(stats["peak_rss_kib"] / 1024, 1) if stats["peak_rss_kib"] else None,
+        "backend_hwm_mib": round(stats.get("backend_memory_kib", {}).get("VmHWM", 0) / 1024, 1) or None,
+        "stage_mean_seconds": stats.get("stage_means", {}),
+        "openai_tokens": stats.get("openai_tokens", {}),
+    }
+    for error in stats["errors"][:5]:
+        print(f"  error: {error}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20, help="jobs in flight at once")
+    parser.add_argument("--budget", type=float, default=1000)
+    parser.add_argument("--selection-mode", choices=["llm", "solver"], default="llm")
+    parser.add_argument("--repeat-prompts", action="store_true", help="draw prompts from a small set so caches can hit")
+    parser.add_argument("--image", type=Path, default=_ROOT / "backend" / "livingRoom.jpg")
+    parser.add_argument("--url", help="drive this running backend instead of starting one")
+    parser.add_argument("--backend-port", type=int, default=8801)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--workers", type=int, help="JOB_WORKERS for the started backend")
+    parser.add_argument("--json", type=Path, help="also write the summary to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    processes = []
+    scratch = None
+    try:
+        stub_args = [
+            "--openai-latency", str(args.openai_latency),
+            "--genai-latency", str(args.genai_latency),
+            "--latency-sigma", str(args.latency_sigma),
+            "--openai-error-rate", str(args.openai_error_rate),
+            "--genai-error-rate", str(args.genai_error_rate),
+            "--image-edge", str(args.image_edge),
+        ]
+        processes.append(_start(
+            [sys.executable, "-m", "backend.benchmarks.stub_providers", "--port", str(args.stub_port), *stub_args],
+            dict(os.environ),
+        ))
+
+        base_url = args.url
+        backend_pid = None
+        if base_url is None:
+            scratch = Path(tempfile.mkdtemp(prefix="furnish-bench-"))
+            env = dict(
+                os.environ,
+                OPENAI_API_KEY="stub",
+                GOOGLE_API_KEY="stub",
+                OPENAI_BASE_URL=f"http://127.0.0.1:{args.stub_port}/v1",
+                GENAI_BASE_URL=f"http://127.0.0.1:{args.stub_port}/",
+                CACHE_DIR=str(scratch / "cache"),
+                INPUT_DIR=str(scratch / "input"),
+                RESULTS_DIR=str(scratch / "results"),
+                JOB_STORE="memory",
+                JOB_QUEUE_SIZE=str(max(args.jobs, 256)),
+            )
+            if args.workers:
+                env["JOB_WORKERS"] = str(args.workers)
+            for directory in ("cache", "input", "results"):
+                (scratch / directory).mkdir(parents=True)
+
+            backend = _start(
+                [sys.executable, "-m", "uvicorn", "backend.app.main:app",
+                 "--port", str(args.backend_port), "--log-level", "warning"],
+                env,
+            )
+            processes.append(backend)
+            backend_pid = backend.pid
+            base_url = f"http://127.0.0.1:{args.backend_port}"
+
+        stats = asyncio.run(drive(
+            base_url, args.jobs, args.concurrency, args.image.read_bytes(), args.budget,
+            args.selection_mode, args.repeat_prompts, backend_pid,
+        ))
+        summary = report(stats, args.jobs)
+        print(json.dumps(summary, indent=2))
+        if args.json:
+            args.json.write_text(json.dumps(summary, indent=2))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+        # Uploads and result images of the run
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Cold-start check for the backend.
+
+Measures, each in fresh processes:
+
+- the cumulative `python -X importtime` cost of importing backend.app.main
+- that the import leaves the provider SDKs unloaded and does no network,
+  subprocess or file-writing I/O
+- the time from starting uvicorn until the first request is answered
+
+and exits with status 1 when any of them is over its budget, so a slow or
+side-effecting import fails CI instead of slowing down autoscaling.
+
+    python -m backend.benchmarks.startup --runs 5 --import-budget-ms 1000 --first-request-budget 4
+
+Run it from the repository root.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import List
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+# Imported on first use (see providers.py); must not load with the app
+LAZY_MODULES = ("openai", "google.genai")
+
+_IMPORT_CHECK = """
+import json, sys
+events = []
+def audit(event, args):
+    if event in ("socket.connect", "socket.getaddrinfo", "subprocess.Popen", "os.mkdir", "os.remove", "os.rename", "sqlite3.connect"):
+        events.append(f"{event} {args!r:.120}")
+    elif event == "open" and isinstance(args[1], str) and any(flag in args[1] for flag in "wax+"):
+        events.append(f"open for writing {args[0]}")
+sys.addaudithook(audit)
+import backend.app.main
+print(json.dumps({"loaded": [name for name in %r if name in sys.modules], "io": events}))
+""" % (LAZY_MODULES,)
+
+
+def import_times(runs: int) -> List[dict]:
+    """Cumulative and per-module import cost of backend.app.main, one fresh interpreter per run"""
+    results = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import backend.app.main"],
+            cwd=_ROOT, capture_output=True, text=True, check=True,
+        )
+        modules = {}
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            # Nesting is two spaces per level; keep the app and what it imports directly
+            name = name[1:]
+            if len(name) - len(name.lstrip()) <= 2:
+                modules[name.strip()] = int(cumulative) / 1000
+        results.append(modules)
+    return results
+
+
+def import_side_effects() -> dict:
+    completed = subprocess.run([sys.executable, "-c", _IMPORT_CHECK], cwd=_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_seconds(timeout: float = 60.0) -> float:
+    """Seconds from starting uvicorn until /health/live answers"""
+    with tempfile.TemporaryDirectory(prefix="furnish-startup-") as scratch:
+        return _time_first_request(Path(scratch), timeout)
+
+
+def _time_first_request(scratch: Path, timeout: float) -> float:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="stub",
+        GOOGLE_API_KEY="stub",
+        # Nothing listens there; the background health check fails fast, offline
+        OPENAI_BASE_URL="http://127.0.0.1:9/v1",
+        GENAI_BASE_URL="http://127.0.0.1:9/",
+        CACHE_DIR=str(scratch / "cache"),
+        INPUT_DIR=str(scratch / "input"),
+        RESULTS_DIR=str(scratch / "results"),
+        JOB_STORE="memory",
+    )
+    for directory in ("cache", "input", "results"):
+        (scratch / directory).mkdir(parents=True)
+
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.monotonic() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"backend exited with status {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/live", timeout=1) as response:
+                    if response.status == 200:
+                        return time.monotonic() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"backend did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement; the median counts")
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--first-request-budget", type=float, default=4.0, help="seconds")
+    parser.add_argument("--top", type=int, default=8, help="heaviest imports to list")
+    parser.add_argument("--json", type=Path, help="also write the summary to this file")
+    args = parser.parse_args()
+
+    profiles = import_times(args.runs)
+    import_ms = statistics.median(profile["backend.app.main"] for profile in profiles)
+    # What backend.app.main imports directly, each charged with everything it pulled in first
+    heaviest = sorted(
+        ((name, statistics.median(profile.get(name, 0) for profile in profiles))
+         for name in profiles[0] if name != "backend.app.main"),
+        key=lambda entry: entry[1], reverse=True,
+    )
+    side_effects = import_side_effects()
+    first_request = statistics.median(first_request_seconds() for _ in range(args.runs))
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import takes {import_ms:.0f} ms, budget {args.import_budget_ms:.0f} ms")
+    if first_request > args.first_request_budget:
+        failures.append(f"first request after {first_request:.2f}s, budget {args.first_request_budget:.2f}s")
+    if side_effects["loaded"]:
+        failures.append(f"import loads {', '.join(side_effects['loaded'])}")
+    if side_effects["io"]:
+        failures.append(f"import does I/O: {'; '.join(side_effects['io'][:5])}")
+
+    summary = {
+        "import_ms": round(import_ms, 1),
+        "import_budget_ms": args.import_budget_ms,
+        "first_request_seconds": round(first_request, 3),
+        "first_request_budget_seconds": args.first_request_budget,
+        "heaviest_imports_ms": {name: round(ms, 1) for name, ms in heaviest[:args.top]},
+        "lazy_modules_loaded": side_effects["loaded"],
+        "import_io": side_effects["io"],
+        "failures": failures,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
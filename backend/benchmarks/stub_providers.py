@@ -0,0 +1,177 @@
+"""
+Local stand-ins for the OpenAI chat completions and Gemini generateContent
+endpoints, with configurable latency and error rates.
+
+Point the backend at them with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+    GENAI_BASE_URL=http://127.0.0.1:8900/
+
+Run on its own with:
+
+    python -m backend.benchmarks.stub_providers --port 8900 --genai-latency 8
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import re
+import time
+from io import BytesIO
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from PIL import Image
+
+# Catalog ids look like AP-SOF-GLOSTAD-50489012
+_PRODUCT_ID = re.compile(r"\b([A-Z]{2}-[A-Z]{2,4}-[^\s|,\"]+)")
+
+
+class Latency:
+    """Log-normal latency with the given median; sigma 0 makes it constant"""
+
+    def __init__(self, median: float, sigma: float = 0.0):
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median), self.sigma)
+
+
+def _image_payload(edge: int) -> str:
+    # Noise compresses badly, like a real render
+    image = Image.effect_noise((edge, edge), 64).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def _pick_products(text: str):
+    """First candidate row of each category ("## sofas" table), as a real selection would"""
+    picked = []
+    if "CANDIDATES:" in text:
+        lines = text[text.index("CANDIDATES:"):].splitlines()
+        for header, row in zip(lines, lines[1:]):
+            ids = _PRODUCT_ID.findall(row)
+            if header.startswith("## ") and ids:
+                picked.append(ids[0])
+    return picked
+
+
+def create_app(
+        openai_latency: Latency,
+        genai_latency: Latency,
+        openai_error_rate: float = 0.0,
+        genai_error_rate: float = 0.0,
+        image_edge: int = 1024,
+) -> FastAPI:
+    app = FastAPI()
+    image_data = _image_payload(image_edge)
+    counts = {"chat": 0, "generate": 0, "errors": 0}
+    seen_prefixes = set()
+
+    def _error(message: str):
+        counts["errors"] += 1
+        return JSONResponse(status_code=503, content={"error": {"code": 503, "message": message, "status": "UNAVAILABLE"}})
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counts["chat"] += 1
+        await asyncio.sleep(openai_latency.sample())
+        if random.random() < openai_error_rate:
+            return _error("stub overloaded")
+
+        messages = body.get("messages", [])
+        prompt = " ".join(message.get("content", "") for message in messages)
+        content = json.dumps({
+            "selected_items": [{"product_id": product_id} for product_id in _pick_products(prompt)],
+            "total_price": 0,
+            "design_rationale": "stub",
+        })
+        prompt_tokens = len(prompt) // 4
+
+        # Like OpenAI's prefix cache: a repeated system message of 1024+ tokens
+        # is reported as cached, in 128-token steps
+        prefix = messages[0].get("content", "") if messages else ""
+        cached_tokens = 0
+        if prefix in seen_prefixes and len(prefix) // 4 >= 1024:
+            cached_tokens = (len(prefix) // 4) // 128 * 128
+        seen_prefixes.add(prefix)
+
+        return {
+            "id": f"chatcmpl-stub-{counts['chat']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    @app.get("/{version}/models/{model}")
+    async def get_model(version: str, model: str):
+        return {"name": f"models/{model}", "displayName": model}
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(version: str, model: str, request: Request):
+        await request.body()
+        counts["generate"] += 1
+        await asyncio.sleep(genai_latency.sample())
+        if random.random() < genai_error_rate:
+            return _error("stub overloaded")
+
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"inlineData": {"mimeType": "image/png", "data": image_data}}]},
+                "finishReason": "STOP",
+            }],
+            "modelVersion": model,
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--openai-latency", type=float, default=2.0, help="median seconds per chat completion")
+    parser.add_argument("--genai-latency", type=float, default=8.0, help="median seconds per image generation")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="log-normal spread, 0 for constant latency")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--genai-error-rate", type=float, default=0.0)
+    parser.add_argument("--image-edge", type=int, default=1024, help="size of the returned render")
+
+
+def app_from_args(args) -> FastAPI:
+    return create_app(
+        Latency(args.openai_latency, args.latency_sigma),
+        Latency(args.genai_latency, args.latency_sigma),
+        args.openai_error_rate,
+        args.genai_error_rate,
+        args.image_edge,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(app_from_args(args), host=args.host, port=args.port, log_level="warning")
@@ -1,5 +1,4 @@
 import requests
-import time
 import json
 from pathlib import Path
 
@@ -33,24 +32,23 @@ if response.status_code != 200:
 job_id = response.json()["job_id"]
 print(f"Job ID: {job_id}\n")
 
-# 4. Poll for status
-max_attempts = 70
-for attempt in range(max_attempts):
-    print(f"Checking status (attempt {attempt + 1})...")
-    status_response = requests.get(f"{BASE_URL}/jobs/status/{job_id}")
-    status_data = status_response.json()
-    print(f"Status: {status_data}\n")
+# 4. Stream status updates until the job finishes
+with requests.get(f"{BASE_URL}/jobs/events/{job_id}", stream=True) as events:
+    for line in events.iter_lines(decode_unicode=True):
+        if not line.startswith("data: "):
+            continue
 
-    job_status = status_data["job_status"]
+        status_data = json.loads(line[len("data: "):])
+        print(f"Status: {status_data}\n")
 
-    if job_status == "done":
-        print("Job completed!")
-        break
-    elif job_status == "failed":
-        print("Job failed!")
-        break
+        job_status = status_data["job_status"]
 
-    time.sleep(2)  # Wait 2 seconds before checking again
+        if job_status == "done":
+            print("Job completed!")
+            break
+        elif job_status == "failed":
+            print("Job failed!")
+            break
 
 # 5. Get results
 #print("Fetching results...")
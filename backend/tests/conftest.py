@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# backend.app is imported from the repository root, as uvicorn does
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,72 @@
+import pytest
+
+from backend.app import solver
+from backend.app.generator import InteriorDesignGenerator, NoItemsFitError
+
+
+def item(product_id, price, style=()):
+    return {"product_id": product_id, "category": {"style": list(style)}, "pricing": {"price": price}}
+
+
+def ids(records):
+    return sorted(record["product_id"] for record in records)
+
+
+INVENTORY = {
+    "sofas": [item("sofa-modern", 800, ["Modern"]), item("sofa-rustic", 500, ["Rustic"])],
+    "lamps": [item("lamp-modern", 120, ["Modern"]), item("lamp-basic", 40)],
+    "armchairs": [item("chair-modern", 300, ["Modern"]), item("chair-basic", 150)],
+}
+
+
+def test_picks_one_item_per_category():
+    selected = solver.select_items(INVENTORY, "modern", 10_000)
+    assert ids(selected) == ["chair-modern", "lamp-modern", "sofa-modern"]
+
+
+def test_best_scoring_selection_within_budget():
+    # Everything modern costs 1220; two modern items beat only the modern sofa
+    selected = solver.select_items(INVENTORY, "modern", 1000)
+    assert ids(selected) == ["chair-modern", "lamp-modern", "sofa-rustic"]
+    assert sum(record["pricing"]["price"] for record in selected) <= 1000
+
+
+def test_exact_budget_is_allowed():
+    inventory = {"sofas": [item("a", 99.99)], "lamps": [item("b", 100.01)]}
+    assert ids(solver.select_items(inventory, "", 200)) == ["a", "b"]
+    # Equal scores: the cheaper item wins
+    assert ids(solver.select_items(inventory, "", 199.99)) == ["a"]
+
+
+def test_empty_when_nothing_fits():
+    assert solver.select_items(INVENTORY, "modern", 10) == []
+    assert solver.select_items(INVENTORY, "modern", 0) == []
+    assert solver.select_items({}, "modern", 1000) == []
+
+
+def test_leaves_a_category_empty_only_when_nothing_in_it_fits():
+    inventory = {"sofas": [item("sofa", 2000)], "lamps": [item("lamp", 50)], "armchairs": [item("chair", 100)]}
+    assert ids(solver.select_items(inventory, "", 500)) == ["chair", "lamp"]
+
+
+def test_fills_categories_before_maximizing_score():
+    # One modern sofa alone scores higher than two plain items, but covers fewer categories
+    inventory = {"sofas": [item("sofa-modern", 900, ["Modern"]), item("sofa", 400)], "lamps": [item("lamp", 500)]}
+    assert ids(solver.select_items(inventory, "modern", 900)) == ["lamp", "sofa"]
+
+
+def test_repair_keeps_a_selection_within_budget():
+    selected = [INVENTORY["sofas"][1], INVENTORY["lamps"][1]]
+    assert solver.repair(selected, INVENTORY, "modern", 1000) is selected
+
+
+def test_repair_keeps_as_many_picks_as_fit():
+    selected = [INVENTORY["sofas"][0], INVENTORY["lamps"][0], INVENTORY["armchairs"][0]]
+    repaired = solver.repair(selected, INVENTORY, "modern", 1000)
+    assert sum(record["pricing"]["price"] for record in repaired) <= 1000
+    assert len(set(ids(repaired)) & set(ids(selected))) == 2
+
+
+def test_empty_selection_fails_instead_of_rendering_an_empty_room():
+    with pytest.raises(NoItemsFitError):
+        InteriorDesignGenerator._format_selection("modern", 10, solver.select_items(INVENTORY, "modern", 10))
@@ -10,6 +10,13 @@ import InitialForm from "../components/InitialForm";
 import EditForm from "../components/EditForm";
 import ResultsDisplay from "../components/ResultsDisplay";
 
+interface JobResults {
+  job_status: string;
+  total_price: number;
+  items: string[];
+  image_url?: string;
+}
+
 const Home: React.FC = () => {
   const [image, setImage] = useState<File | null>(null);
   const [preview, setPreview] = useState<string | null>(null);
@@ -21,10 +28,32 @@ const Home: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
   const [editPrompt, setEditPrompt] = useState("");
   const [totalPrice, setTotalPrice] = useState<number | null>(null);
+  const [currentJobId, setCurrentJobId] = useState<string | null>(null);
 
   const BASE_URL = "http://localhost:8000";
   const RESULTS_PATH = "";
 
+  // Resolves with the job results as soon as the server pushes the "done" event
+  const waitForJob = (jobId: string) =>
+    new Promise<JobResults>((resolve, reject) => {
+      const events = new EventSource(`${BASE_URL}/jobs/events/${jobId}`);
+
+      events.addEventListener("done", (event) => {
+        events.close();
+        resolve(JSON.parse((event as MessageEvent).data).results);
+      });
+
+      events.addEventListener("failed", () => {
+        events.close();
+        reject(new Error("Job failed on server"));
+      });
+
+      events.onerror = () => {
+        events.close();
+        reject(new Error("Lost connection while waiting for the job"));
+      };
+    });
+
   const handleImageUpload = (event: React.ChangeEvent<HTMLInputElement>) => {
     const file = event.target.files?.[0];
     if (file) {
@@ -70,34 +99,15 @@ const Home: React.FC = () => {
       const jobData = await jobResponse.json();
       const jobId = jobData.job_id;
   
-      // 2. Poll for status
-      let jobStatus = "pending";
-      for (let attempt = 0; attempt < 70; attempt++) {
-        const statusResponse = await fetch(`${BASE_URL}/jobs/status/${jobId}`);
-        if (!statusResponse.ok) throw new Error("Failed to check job status");
-  
-        const statusData = await statusResponse.json();
-        jobStatus = statusData.job_status;
-  
-        if (jobStatus === "done") break;
-        if (jobStatus === "failed") throw new Error("Job failed on server");
-  
-        await new Promise((resolve) => setTimeout(resolve, 2000)); // wait 2s
-      }
-  
-      if (jobStatus !== "done") throw new Error("Job did not complete in time");
-  
-      // 3. Fetch results
-      const resultResponse = await fetch(`${BASE_URL}/jobs/results/${jobId}`);
-      if (!resultResponse.ok) throw new Error("Failed to fetch results");
-  
-      const resultData = await resultResponse.json();
+      // 2. Wait for the job to finish
+      const resultData = await waitForJob(jobId);
       console.log(resultData);
       const jobIdStr = String(jobId);
+      setCurrentJobId(jobIdStr);
   
       // Redesigned room image
       console.log(jobIdStr);
-      const redesignedImagePath = `/${jobIdStr}.png`;
+      const redesignedImagePath = `${BASE_URL}${resultData.image_url ?? `/jobs/image/${jobIdStr}`}`;
       console.log(redesignedImagePath)
       setResultImage(redesignedImagePath);
   
@@ -126,6 +136,10 @@ const Home: React.FC = () => {
       setError("Please enter modifications you'd like to make.");
       return;
     }
+    if (!currentJobId) {
+      setError("Generate a design before editing it.");
+      return;
+    }
   
     setLoading(true);
     setError(null);
@@ -148,38 +162,19 @@ const Home: React.FC = () => {
       const editJobData = await editResponse.json();
       const editJobId = editJobData.job_id;
   
-      // 2. Poll for status
-      let jobStatus = "pending";
-      for (let attempt = 0; attempt < 70; attempt++) {
-        const statusResponse = await fetch(`${BASE_URL}/jobs/status/${editJobId}`);
-        if (!statusResponse.ok) throw new Error("Failed to check edit job status");
-  
-        const statusData = await statusResponse.json();
-        jobStatus = statusData.job_status;
-  
-        if (jobStatus === "done") break;
-        if (jobStatus === "failed") throw new Error("Edit job failed on server");
-  
-        await new Promise((resolve) => setTimeout(resolve, 2000)); // wait 2s
-      }
-  
-      if (jobStatus !== "done") throw new Error("Edit job did not complete in time");
-  
-      // 3. Fetch results
-      const resultResponse = await fetch(`${BASE_URL}/jobs/results/${editJobId}`);
-      if (!resultResponse.ok) throw new Error("Failed to fetch edit results");
-  
-      const resultData = await resultResponse.json();
+      // 2. Wait for the edit job to finish
+      const resultData = await waitForJob(editJobId);
       const jobIdStr = String(editJobId);
+      setCurrentJobId(jobIdStr);
   
       // Updated redesigned room image
-      const updatedImagePath = `${RESULTS_PATH}/${jobIdStr}.png`;
+      const updatedImagePath = `${BASE_URL}${resultData.image_url ?? `/jobs/image/${jobIdStr}`}`;
       setResultImage(updatedImagePath);
   
       // Furniture images
-      if (resultData.furniture_ids && Array.isArray(resultData.furniture_ids)) {
-        const furniturePaths = resultData.furniture_ids.map(
-          (furnitureId: string) => `${RESULTS_PATH}/${jobIdStr}_furniture_${furnitureId}.png`
+      if (resultData.items && Array.isArray(resultData.items)) {
+        const furniturePaths = resultData.items.map(
+          (furnitureId: string) => `${RESULTS_PATH}/data/${furnitureId}.jpg`
         );
         setFurnitureImages(furniturePaths);
       }
@@ -198,6 +193,7 @@ const Home: React.FC = () => {
   };  
 
   const handleStartNew = () => {
+    setCurrentJobId(null);
     setResultImage(null);
     setFurnitureImages([]);
     setEditPrompt("");
@@ -0,0 +1,75 @@
+"""
+Compare listing page parsing: BeautifulSoup (html.parser, and the lxml
+backend when installed) against the compiled-XPath lxml path used by the
+runner. Checks that every parser extracts the same products, then reports
+the mean time per page and the speedup.
+
+    python scraping/bench_parse.py --rounds 200
+"""
+import argparse
+import contextlib
+import io
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scraper import extract_product_details, extract_product_details_fast
+
+LISTINGS_DIR = Path(__file__).resolve().parent / "fixtures" / "listings"
+BASE_URL = "http://127.0.0.1"
+
+
+def bs4_parser(features):
+    def parse(html_content):
+        return extract_product_details(BeautifulSoup(html_content, features), BASE_URL)
+    return parse
+
+
+def fast_parser(html_content):
+    return extract_product_details_fast(html_content, BASE_URL)
+
+
+def time_per_page(parse, pages, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for html_content in pages:
+            parse(html_content)
+    return (time.perf_counter() - started) / (rounds * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=Path, default=LISTINGS_DIR)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = [path.read_text(encoding="utf-8") for path in sorted(args.listings.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No listing pages in {args.listings}")
+
+    parsers = {"bs4 html.parser": bs4_parser("html.parser")}
+    try:
+        BeautifulSoup("", "lxml")
+        parsers["bs4 lxml"] = bs4_parser("lxml")
+    except Exception:
+        pass
+    parsers["lxml xpath"] = fast_parser
+
+    # The extractors print progress per page; keep it out of the report and the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = [bs4_parser("html.parser")(html_content) for html_content in pages]
+        for name, parse in parsers.items():
+            if [parse(html_content) for html_content in pages] != expected:
+                raise SystemExit(f"{name} extracted different products than bs4 html.parser")
+        timings = {name: time_per_page(parse, pages, args.rounds) for name, parse in parsers.items()}
+
+    products = sum(len(page) for page in expected)
+    print(f"{len(pages)} pages, {products} products, {args.rounds} rounds")
+    baseline = timings["bs4 html.parser"]
+    for name, seconds in timings.items():
+        print(f"{name:>16}: {seconds * 1000:7.3f} ms/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Local HTTP server for saved listing pages and product images, so the
+scraping pipeline can run without the network.
+
+    /search/?q=sofa&page=2  ->  fixtures/listings/sofa-2.html
+    /images/<file>          ->  fixtures/images/<file>
+
+A listing page that has no fixture comes back as an empty result page,
+like a real shop past its last page. Static files carry an ETag and a
+Last-Modified header and answer conditional GETs with 304, like a CDN.
+"""
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+EMPTY_LISTING = b"<!DOCTYPE html><html><body><main><p>No results</p></main></body></html>"
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _listing_path(self):
+        url = urlparse(self.path)
+        if not url.path.rstrip("/").endswith("/search"):
+            return None
+        query = parse_qs(url.query)
+        name = query.get("q", [""])[0]
+        page = query.get("page", ["1"])[0]
+        return Path(self.directory) / "listings" / f"{name}-{page}.html"
+
+    def _etag(self):
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            return None
+        stat = path.stat()
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def end_headers(self):
+        if getattr(self, "etag", None):
+            self.send_header("ETag", self.etag)
+        super().end_headers()
+
+    def send_head(self):
+        listing = self._listing_path()
+        if listing is None:
+            self.etag = self._etag()
+            if self.etag and self.etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.end_headers()
+                return None
+            return super().send_head()
+
+        body = listing.read_bytes() if listing.is_file() else EMPTY_LISTING
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return _Body(body)
+
+
+class _Body:
+    """File-like wrapper so send_head() can hand back in-memory bytes"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self, *args):
+        data, self.data = self.data, b""
+        return data
+
+    def close(self):
+        pass
+
+
+class FixtureServer:
+    """with FixtureServer() as server: ... server.url"""
+
+    def __init__(self, directory: Path = FIXTURES_DIR, port: int = 0):
+        handler = partial(FixtureHandler, directory=str(directory))
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    with FixtureServer(port=8765) as server:
+        print(f"Serving {FIXTURES_DIR} on {server.url}, Ctrl+C to stop")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
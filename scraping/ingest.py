@@ -0,0 +1,337 @@
+"""
+Build the served catalog from the hand-curated category files and the
+scraper output, incrementally.
+
+Inputs are the curated records in scraping/<category>.json (the rich schema
+the backend reads) and the flat scraper records in scraping/raw/<category>.json.
+A scraped record belongs to the catalog product with the same SKU; unknown
+SKUs become new products. The curated record wins for everything it
+describes, the scrape refreshes price, currency, product link and image URL.
+
+The result is one SQLite file (scraping/catalog.sqlite by default) with a
+row per product holding its final JSON record. Every row keeps the hashes of
+its inputs, and every input file's hash is stored too, so a rerun skips
+unchanged files, only decodes and merges records whose inputs changed and
+only writes rows whose merged record changed. The backend loads the file in
+one query and picks up a new build when the file changes.
+
+    python scraping/runner.py --queries scraping/queries.json
+    python scraping/ingest.py
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+from contextlib import closing
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+SCRAPING_DIR = Path(__file__).resolve().parent
+# What the backend serves (its CATALOG_CATEGORIES default). Rugs are scraped
+# too; add them with --categories once the backend serves them.
+CATEGORIES = ["sofas", "lamps", "armchairs"]
+
+# Bump when the table layout changes; backend/app/catalog.py checks it
+FORMAT_VERSION = 1
+# Bump when the way inputs are read or merged changes, so every file is processed again
+RULES_VERSION = 2
+
+# (product id code, category.main, category.sub) for products that are only known from a scrape
+CATEGORY_DEFAULTS = {
+    "sofas": ("SOF", "Seating", "Sofas"),
+    "lamps": ("LMP", "Lighting", "Lamps"),
+    "armchairs": ("CHR", "Seating", "Armchairs"),
+    "rugs": ("RUG", "Floor Coverings", "Area Rugs"),
+}
+
+# Scraper fields that describe the product; source_url and category only say where it was found
+SCRAPED_FIELDS = ("sku", "name", "full_description", "price", "currency", "product_link", "image_url", "color_hint")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    sku TEXT,
+    curated TEXT,
+    curated_hash TEXT,
+    scraped TEXT,
+    scraped_hash TEXT,
+    record TEXT NOT NULL,
+    record_hash TEXT NOT NULL,
+    build INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_sku ON products (sku);
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, sha256 TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def normalize_sku(value):
+    """'294.896.03' and '29489603' are the same article; 'N/A' is no SKU"""
+    if not value:
+        return None
+    sku = "".join(char for char in str(value) if char.isalnum()).upper()
+    return sku if sku and sku != "NA" else None
+
+
+def _ascii_upper(text):
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return "".join(char for char in folded.upper() if char.isalnum())
+
+
+def new_product_id(category, scraped):
+    code = CATEGORY_DEFAULTS.get(category, (category[:3].upper(), "", ""))[0]
+    name = _ascii_upper(scraped.get("name", "")) or "ITEM"
+    return f"AP-{code}-{name}-{normalize_sku(scraped['sku'])}"
+
+
+# What scraper.py writes when a card lacks a field; never real data
+MISSING_VALUES = {"", "N/A", "Link not found", "Unknown"}
+
+
+def _present(value):
+    if isinstance(value, str):
+        return value.strip() not in MISSING_VALUES
+    return value is not None
+
+
+def scraped_view(product):
+    """The fields of a scraper record that matter, with URLs made absolute and placeholders as None"""
+    view = {field: product.get(field) if _present(product.get(field)) else None for field in SCRAPED_FIELDS}
+    # A card without data-price comes out as 0.0
+    if not isinstance(view["price"], (int, float)) or view["price"] <= 0:
+        view["price"] = None
+    page = product.get("source_url") or product.get("product_link") or ""
+    if view["image_url"]:
+        view["image_url"] = urljoin(page, view["image_url"])
+    return view
+
+
+def record_from_scrape(product_id, category, scraped):
+    _, main, sub = CATEGORY_DEFAULTS.get(category, ("", "", ""))
+    description = scraped.get("full_description") or ""
+    return {
+        "product_id": product_id,
+        "product_name": f"{scraped.get('name', '')} {description}".strip(),
+        "description": description,
+        "website_details": {
+            "website_name": urlparse(scraped.get("product_link") or "").netloc,
+            "product_url": scraped.get("product_link"),
+            "external_sku": scraped.get("sku"),
+        },
+        "category": {"main": main, "sub": sub, "style": []},
+        "physical_attributes": {"color": scraped.get("color_hint") or ""},
+        "suitability_meta": {"room_type": [], "ambiance": [], "feature_tags": []},
+        "pricing": {"currency": scraped.get("currency") or "EUR", "price": scraped.get("price") or 0},
+    }
+
+
+def merge(product_id, category, curated, scraped):
+    """The served record: curated content with the latest scraped price and links"""
+    if curated is None:
+        record = record_from_scrape(product_id, category, scraped)
+    else:
+        record = json.loads(json.dumps(curated))
+    if scraped is not None:
+        if scraped.get("price") is not None:
+            record.setdefault("pricing", {})["price"] = scraped["price"]
+        if scraped.get("currency"):
+            record.setdefault("pricing", {})["currency"] = scraped["currency"]
+        website = record.setdefault("website_details", {})
+        if scraped.get("product_link"):
+            website["product_url"] = scraped["product_link"]
+        if scraped.get("image_url"):
+            website["image_url"] = scraped["image_url"]
+        attributes = record.setdefault("physical_attributes", {})
+        if not attributes.get("color") and scraped.get("color_hint"):
+            attributes["color"] = scraped["color_hint"]
+    return record
+
+
+class CatalogBuild:
+    """One ingest run against an open catalog database"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = {
+            product_id: {"category": category, "sku": sku, "curated_hash": curated_hash, "scraped_hash": scraped_hash}
+            for product_id, category, sku, curated_hash, scraped_hash in db.execute(
+                "SELECT product_id, category, sku, curated_hash, scraped_hash FROM products"
+            )
+        }
+        self.by_sku = {row["sku"]: product_id for product_id, row in self.rows.items() if row["sku"]}
+        self.sources = dict(db.execute("SELECT path, sha256 FROM sources"))
+        self.build = int(dict(db.execute("SELECT key, value FROM meta")).get("build", "0")) + 1
+
+        # product_id -> {"category", "sku", "curated"?, "scraped"?} for rows whose inputs changed;
+        # an input is (canonical text, parsed value), or None once it is gone
+        self.pending = {}
+        self.seen_files = {}
+        self.counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "skipped": 0, "files_skipped": 0}
+
+    def _read_source(self, path):
+        """Parsed records of path, or None when it is missing or unchanged since the last build"""
+        if not path.is_file():
+            return None
+        raw = path.read_bytes()
+        sha256 = hashlib.sha256(f"rules-v{RULES_VERSION}:".encode() + raw).hexdigest()
+        self.seen_files[str(path)] = sha256
+        if self.sources.get(str(path)) == sha256:
+            self.counts["files_skipped"] += 1
+            return None
+        return json.loads(raw)
+
+    def _change(self, product_id, category, **inputs):
+        change = self.pending.setdefault(product_id, {"category": category})
+        change.update(inputs)
+        if change.get("sku"):
+            self.by_sku.setdefault(change["sku"], product_id)
+
+    def add_curated(self, category, path):
+        records = self._read_source(path)
+        if records is None:
+            return
+        listed = set()
+        for record in records:
+            product_id = record["product_id"]
+            listed.add(product_id)
+            text = canonical(record)
+            if self.rows.get(product_id, {}).get("curated_hash") != digest(text):
+                self._change(product_id, category, curated=(text, record),
+                             sku=normalize_sku(record.get("website_details", {}).get("external_sku")))
+
+        # Dropped from the file: the product stays only if a scrape still knows it
+        for product_id, row in self.rows.items():
+            if row["category"] == category and row["curated_hash"] and product_id not in listed:
+                self._change(product_id, category, curated=None)
+
+    def add_scraped(self, category, path, prune=False):
+        products = self._read_source(path)
+        if products is None:
+            return
+        seen = set()
+        for product in products:
+            sku = normalize_sku(product.get("sku"))
+            if sku is None:
+                continue
+            view = scraped_view(product)
+            text = canonical(view)
+            product_id = self.by_sku.get(sku) or new_product_id(category, view)
+            seen.add(product_id)
+            if self.rows.get(product_id, {}).get("scraped_hash") != digest(text):
+                self._change(product_id, self.rows.get(product_id, {}).get("category", category),
+                             scraped=(text, view), sku=sku)
+
+        if prune:
+            for product_id, row in self.rows.items():
+                if row["category"] == category and row["scraped_hash"] and product_id not in seen:
+                    self._change(product_id, category, scraped=None)
+
+    def apply(self):
+        """Merge and write the changed rows; returns True if the catalog changed"""
+        for product_id, change in self.pending.items():
+            stored = self.db.execute(
+                "SELECT curated, scraped, record_hash, build FROM products WHERE product_id = ?", (product_id,)
+            ).fetchone()
+            curated, scraped, old_hash, old_build = stored or (None, None, None, None)
+            # Inputs this run did not touch come from the stored row
+            curated = change["curated"] if "curated" in change else (curated and (curated, json.loads(curated)))
+            scraped = change["scraped"] if "scraped" in change else (scraped and (scraped, json.loads(scraped)))
+
+            # Without a curated record, a scrape that has no price cannot be served
+            if not curated and not (scraped and scraped[1].get("price")):
+                if scraped:
+                    print(f"Skipping {product_id}: the scrape has no price")
+                    self.counts["skipped"] += 1
+                if stored:
+                    self.db.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+                    self.counts["removed"] += 1
+                continue
+
+            record_text = canonical(merge(
+                product_id, change["category"], curated[1] if curated else None, scraped[1] if scraped else None))
+            record_hash = digest(record_text)
+            if record_hash == old_hash:
+                build = old_build
+                self.counts["unchanged"] += 1
+            else:
+                build = self.build
+                self.counts["updated" if stored else "added"] += 1
+
+            sku = change.get("sku") or self.rows.get(product_id, {}).get("sku")
+            self.db.execute(
+                "INSERT OR REPLACE INTO products "
+                "(product_id, category, sku, curated, curated_hash, scraped, scraped_hash, record, record_hash, build) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (product_id, change["category"], sku,
+                 curated[0] if curated else None, digest(curated[0]) if curated else None,
+                 scraped[0] if scraped else None, digest(scraped[0]) if scraped else None,
+                 record_text, record_hash, build),
+            )
+
+        self.db.executemany("INSERT OR REPLACE INTO sources (path, sha256) VALUES (?, ?)", self.seen_files.items())
+        changed = bool(self.counts["added"] or self.counts["updated"] or self.counts["removed"])
+        if changed:
+            fingerprint = hashlib.sha256()
+            for product_id, record_hash in self.db.execute("SELECT product_id, record_hash FROM products ORDER BY product_id"):
+                fingerprint.update(f"{product_id}:{record_hash};".encode())
+            self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                ("format", str(FORMAT_VERSION)),
+                ("build", str(self.build)),
+                ("fingerprint", fingerprint.hexdigest()[:16]),
+                ("built_at", str(int(time.time()))),
+            ])
+        return changed
+
+
+def ingest(output, categories, curated_dir, raw_dir, prune=False):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(str(output))) as db:
+        db.executescript(SCHEMA)
+        stored_format = db.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+        if stored_format and stored_format[0] != str(FORMAT_VERSION):
+            raise SystemExit(f"{output} has format {stored_format[0]}, expected {FORMAT_VERSION}; delete it to rebuild")
+
+        build = CatalogBuild(db)
+        for category in categories:
+            build.add_curated(category, curated_dir / f"{category}.json")
+        for category in categories:
+            build.add_scraped(category, raw_dir / f"{category}.json", prune)
+        with db:
+            changed = build.apply()
+        return build, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=SCRAPING_DIR / "catalog.sqlite")
+    parser.add_argument("--categories", default=",".join(CATEGORIES))
+    parser.add_argument("--curated-dir", type=Path, default=SCRAPING_DIR, help="hand-maintained <category>.json files")
+    parser.add_argument("--raw-dir", type=Path, default=SCRAPING_DIR / "raw", help="scraper output")
+    parser.add_argument("--prune", action="store_true",
+                        help="forget scraped products of a category that its latest scrape did not return")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    categories = [category.strip() for category in args.categories.split(",") if category.strip()]
+    build, changed = ingest(args.output, categories, args.curated_dir, args.raw_dir, args.prune)
+    counts = build.counts
+    status = f"build {build.build}" if changed else "no changes"
+    print(f"{args.output}: {status}; {counts['added']} added, {counts['updated']} updated, "
+          f"{counts['removed']} removed, {counts['skipped']} skipped without price, "
+          f"{counts['unchanged']} rechecked unchanged, "
+          f"{counts['files_skipped']} input files unchanged ({(time.monotonic() - started) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
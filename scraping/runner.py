@@ -0,0 +1,259 @@
+"""
+Scrape many listing queries concurrently.
+
+Reads a list of queries ({"url", "category", "max_pages"}) and fetches up to
+--concurrency listing pages in parallel, following pagination until a page
+adds no new products. Pages are first fetched over plain HTTP with pooled
+keep-alive connections. Only sites whose product cards are not in the
+server-rendered HTML are loaded in Chrome, from a pool of warm sessions that
+are started on first use and reused for every page. The merged products are
+written to <output-dir>/<category>.json, deduplicated by SKU.
+
+    python scraping/runner.py --queries scraping/queries.json --concurrency 4
+
+--fixtures runs the same pipeline against the saved pages in
+scraping/fixtures, served from a local HTTP server, with no network.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from scraper import (
+    CHROME_DRIVER_PATH,
+    create_driver,
+    create_http_session,
+    extract_product_details_fast,
+    fetch_page_http,
+    has_product_cards,
+    load_listing,
+    quit_driver,
+)
+
+SCRAPING_DIR = Path(__file__).resolve().parent
+
+
+class DriverPool:
+    """
+    At most `size` WebDriver sessions, started on first use and handed out
+    one caller at a time. A session that fails is quit, its profile deleted,
+    and replaced.
+    """
+
+    def __init__(self, size, factory):
+        self.size = size
+        self.factory = factory
+        self._idle = []
+        self._created = 0
+        # Signalled whenever a session is returned or a slot frees up
+        self._available = threading.Condition()
+        self.started = 0
+
+    def _acquire(self):
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            driver = self.factory()
+        except Exception:
+            self._free_slot()
+            raise
+        with self._available:
+            self.started += 1
+        return driver
+
+    def _free_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _discard(self, driver):
+        # Free the slot first so a waiting caller can start a replacement
+        self._free_slot()
+        try:
+            quit_driver(driver)
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except Exception:
+            self._discard(driver)
+            raise
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def close(self):
+        with self._available:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._discard(driver)
+
+
+def page_url(url, page, page_param="page"):
+    """url with its page query parameter set; page 1 is the url as given"""
+    if page == 1:
+        return url
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query[page_param] = [str(page)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def base_url_of(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def fetch_with_retry(pool, url, attempts=2):
+    for attempt in range(1, attempts + 1):
+        try:
+            with pool.session() as driver:
+                return load_listing(driver, url)
+        except Exception as e:
+            print(f"Loading {url} failed (attempt {attempt}/{attempts}): {e}")
+    return None
+
+
+class ListingFetcher:
+    """
+    mode "auto": plain HTTP, falling back to the browser pool for sites whose
+    cards only appear after JavaScript runs; "http" or "browser" to force one.
+    """
+
+    def __init__(self, mode, pool, session):
+        self.mode = mode
+        self.pool = pool
+        self.session = session
+        self._http_hosts = set()
+        self._browser_hosts = set()
+        self.http_pages = 0
+        self.browser_pages = 0
+
+    def __call__(self, url):
+        host = urlparse(url).netloc
+        if self.mode != "browser" and host not in self._browser_hosts:
+            html_content = fetch_page_http(self.session, url)
+            cards = has_product_cards(html_content)
+            # Without cards on a site already served over HTTP, the page is just empty
+            if html_content is not None and (cards or host in self._http_hosts or self.mode == "http"):
+                if cards:
+                    self._http_hosts.add(host)
+                self.http_pages += 1
+                return html_content
+
+        html_content = fetch_with_retry(self.pool, url)
+        self.browser_pages += 1
+        if has_product_cards(html_content) and host not in self._http_hosts:
+            print(f"{host} renders its products with JavaScript, using the browser from now on")
+            self._browser_hosts.add(host)
+        return html_content
+
+
+def scrape_query(fetch, query, default_max_pages):
+    """All products of one query, following pages until one adds nothing new"""
+    products = {}
+    max_pages = query.get("max_pages", default_max_pages)
+
+    for page in range(1, max_pages + 1):
+        url = page_url(query["url"], page, query.get("page_param", "page"))
+        html_content = fetch(url)
+        if not html_content:
+            break
+
+        new = 0
+        for product in extract_product_details_fast(html_content, base_url_of(url)):
+            if product["sku"] not in products:
+                product["category"] = query["category"]
+                product["source_url"] = url
+                products[product["sku"]] = product
+                new += 1
+        print(f"{query['category']}: page {page} of {query['url']} added {new} products")
+        if new == 0:
+            break
+
+    return list(products.values())
+
+
+def run(queries, fetch, concurrency, max_pages):
+    """Scrape all queries, `concurrency` at a time; returns {category: [products]}"""
+    by_category = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = executor.map(lambda query: scrape_query(fetch, query, max_pages), queries)
+        for query, products in zip(queries, results):
+            merged = by_category.setdefault(query["category"], {})
+            for product in products:
+                merged.setdefault(product["sku"], product)
+    return {category: list(products.values()) for category, products in by_category.items()}
+
+
+def save_results(by_category, output_dir):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for category, products in by_category.items():
+        path = output_dir / f"{category}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(products, f, indent=4, ensure_ascii=False)
+        print(f"Saved {len(products)} {category} to {path}")
+
+
+def load_queries(path, base_url=None):
+    with open(path, encoding="utf-8") as f:
+        queries = json.load(f)
+    if base_url:
+        for query in queries:
+            query["url"] = query["url"].replace("{base}", base_url)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=Path, default=SCRAPING_DIR / "queries.json")
+    parser.add_argument("--output-dir", type=Path, default=SCRAPING_DIR / "raw")
+    parser.add_argument("--concurrency", type=int, default=4, help="browser sessions and queries in parallel")
+    parser.add_argument("--max-pages", type=int, default=10)
+    parser.add_argument("--driver", default=CHROME_DRIVER_PATH, help="path to chromedriver")
+    parser.add_argument("--fetch", choices=["auto", "http", "browser"], default="auto",
+                        help="plain HTTP with browser fallback (auto), or only one of them")
+    parser.add_argument("--fixtures", action="store_true", help="scrape the saved pages in scraping/fixtures")
+    args = parser.parse_args()
+
+    server = None
+    queries_path = args.queries
+    if args.fixtures:
+        from fixture_server import FIXTURES_DIR, FixtureServer
+        server = FixtureServer().__enter__()
+        queries_path = FIXTURES_DIR / "queries.json"
+
+    pool = DriverPool(args.concurrency, lambda: create_driver(args.driver))
+    fetcher = ListingFetcher(args.fetch, pool, create_http_session(args.concurrency))
+    started = time.monotonic()
+    try:
+        queries = load_queries(queries_path, server.url if server else None)
+        by_category = run(queries, fetcher, args.concurrency, args.max_pages)
+    finally:
+        pool.close()
+        fetcher.session.close()
+        if server:
+            server.__exit__(None, None, None)
+
+    save_results(by_category, args.output_dir)
+    total = sum(len(products) for products in by_category.values())
+    print(f"Scraped {total} products from {len(queries)} queries in {time.monotonic() - started:.1f}s: "
+          f"{fetcher.http_pages} pages over HTTP, {fetcher.browser_pages} in the browser "
+          f"({pool.started} browser sessions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import time
 import json
 import re
+import shutil
+import tempfile
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By 
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import requests # Needed for requests.compat.urljoin
+from lxml import etree
+from lxml import html as lxml_html
 
 # --- CONFIGURATION ⚙️ ---
 TARGET_URL = "https://www.ikea.com/de/en/search/?q=sofa"
@@ -18,10 +23,11 @@ BASE_URL = "https://www.ikea.com"
 # It assumes 'chromedriver' is in the SAME folder as this scraper.py file.
 CHROME_DRIVER_PATH = './chromedriver' 
 
-def fetch_page_selenium(url, driver_path):
-    """Fetches the page using Selenium with an explicit wait for dynamic content."""
-    print("Starting Selenium to load dynamic content...")
-    
+PRODUCT_CARD_SELECTOR = 'div[data-testid="plp-product-card"]'
+
+
+def create_driver(driver_path):
+    """Starts a headless Chrome session. Reuse it for many pages; starting Chrome is the slow part."""
     chrome_options = webdriver.ChromeOptions()
     
     # --- ESSENTIAL FIXES FOR 'DevToolsActivePort' ERROR ---
@@ -40,33 +46,62 @@ def fetch_page_selenium(url, driver_path):
     # 5. Disable logging (can speed up startup slightly)
     chrome_options.add_argument('--log-level=3')
     
-    # 6. Set a temporary user data directory
-    chrome_options.add_argument('--user-data-dir=/tmp/chrome_profile') 
+    # 6. A fresh temporary user data directory per session, so parallel
+    #    sessions do not fight over one profile; quit_driver() removes it
+    profile_dir = tempfile.mkdtemp(prefix="chrome_profile_")
+    chrome_options.add_argument(f'--user-data-dir={profile_dir}')
     # -----------------------------------------------------
 
+    service = Service(executable_path=driver_path)
     try:
-        service = Service(executable_path=driver_path)
-    except Exception as e:
-        print(f"Error initializing Chrome Service. Check driver path and permissions: {e}")
-        return None
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    except Exception:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    driver.profile_dir = profile_dir
+    return driver
+
+
+def quit_driver(driver):
+    """Ends the session and deletes its temporary profile."""
+    try:
+        driver.quit()
+    finally:
+        profile_dir = getattr(driver, "profile_dir", None)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def load_listing(driver, url, timeout=20):
+    """Opens url in an existing session and returns the HTML once product cards have rendered."""
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR))
+        )
+    except TimeoutException:
+        # An empty result page (e.g. past the last page) has no cards at all
+        print(f"No product cards appeared within {timeout}s on {url}")
+    return driver.page_source
+
+
+def fetch_page_selenium(url, driver_path):
+    """Fetches the page using Selenium with an explicit wait for dynamic content."""
+    print("Starting Selenium to load dynamic content...")
 
     driver = None
+    html_content = None
     try:
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.get(url)
-        
-        # ... (rest of the wait logic remains the same)
-        # ...
-        
+        driver = create_driver(driver_path)
+        html_content = load_listing(driver, url)
     except Exception as e:
-        # ... (error handling remains the same)
-        pass
+        print(f"Error loading {url} with Selenium: {e}")
     finally:
         if driver:
-            driver.quit()
+            quit_driver(driver)
             print("Selenium browser closed.")
 
-    return html_content # Ensure this line is outside the try/except block if needed, or structured like the full script
+    return html_content
 
 
 def extract_product_details(soup, base_url):
@@ -76,7 +111,7 @@ def extract_product_details(soup, base_url):
     furniture_db = []
     
     # Target the stable div using its data-testid attribute
-    product_cards = soup.select('div[data-testid="plp-product-card"]') 
+    product_cards = soup.select(PRODUCT_CARD_SELECTOR)
     
     if not product_cards:
         print("Error: Could not find any product cards. The selector is incorrect or content is missing.")
@@ -127,6 +162,96 @@ def extract_product_details(soup, base_url):
 
     return furniture_db
 
+# --- FAST PATH: lxml with compiled XPath ⚡ ---
+# Same fields as extract_product_details, but the page is parsed by libxml2
+# and every selector is compiled once at import.
+
+def _has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+_XPATH_CARDS = etree.XPath('//div[@data-testid="plp-product-card"]')
+_XPATH_PRICE_LINK = etree.XPath(f'.//a[{_has_class("plp-price-link-wrapper")}]/@href')
+_XPATH_IMAGE_LINK = etree.XPath(f'.//a[{_has_class("plp-product__image-link")}]/@href')
+_XPATH_IMAGE = etree.XPath(f'.//img[{_has_class("plp-image")}]')
+_XPATH_DESCRIPTION = etree.XPath(f'.//span[{_has_class("plp-price-module__description")}]')
+_COLOR_PATTERN = re.compile(r'\b(white|grey|blue|natural|red|black|green)\b', re.IGNORECASE)
+
+
+def extract_product_details_fast(html_content, base_url):
+    """Parses listing HTML (str or bytes) with lxml; returns the same records as extract_product_details."""
+    furniture_db = []
+    product_cards = _XPATH_CARDS(lxml_html.fromstring(html_content))
+
+    if not product_cards:
+        print("Error: Could not find any product cards. The selector is incorrect or content is missing.")
+        return furniture_db
+
+    for i, card in enumerate(product_cards):
+        product_data = {}
+        try:
+            product_data['price'] = float(card.get('data-price', 0))
+            product_data['currency'] = card.get('data-currency', 'N/A')
+            product_data['name'] = card.get('data-product-name', 'N/A')
+            product_data['sku'] = card.get('data-ref-id', 'N/A')
+
+            links = _XPATH_PRICE_LINK(card) or _XPATH_IMAGE_LINK(card)
+            product_data['product_link'] = requests.compat.urljoin(base_url, links[0]) if links else 'Link not found'
+
+            images = _XPATH_IMAGE(card)
+            product_data['image_url'] = images[0].get('src', 'N/A') if images else 'N/A'
+
+            descriptions = _XPATH_DESCRIPTION(card)
+            product_data['full_description'] = (
+                ''.join(text.strip() for text in descriptions[0].itertext()) if descriptions else 'N/A'
+            )
+
+            color_match = _COLOR_PATTERN.search(images[0].get('alt', '') if images else '')
+            product_data['color_hint'] = color_match.group(0).capitalize() if color_match else 'Unknown'
+
+            furniture_db.append(product_data)
+
+        except Exception as e:
+            print(f"Skipping product {i+1} ({product_data.get('name', 'Unknown')}) due to extraction error: {type(e).__name__} - {e}")
+            continue
+
+    return furniture_db
+
+
+# --- FAST PATH: plain HTTP fetch 🌐 ---
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def create_http_session(pool_size=10):
+    """requests.Session with keep-alive pools sized for pool_size concurrent fetches."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+
+def fetch_page_http(session, url, timeout=20):
+    """Listing HTML as served, without running scripts; None if the request fails."""
+    try:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+    except requests.RequestException as e:
+        print(f"HTTP fetch of {url} failed: {e}")
+        return None
+
+
+def has_product_cards(html_content):
+    """Cheap check whether server-rendered HTML already contains the product cards."""
+    return bool(html_content) and 'data-testid="plp-product-card"' in html_content
+
+
 def save_to_json(data, filename):
     """Saves the list of dictionaries to a pretty-printed JSON file."""
     try:
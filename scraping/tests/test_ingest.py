@@ -0,0 +1,127 @@
+import json
+import sqlite3
+from contextlib import closing
+
+import ingest
+
+CURATED_SOFA = {
+    "product_id": "AP-SB-HYLTARP-29489603",
+    "product_name": "HYLTARP sofa",
+    "website_details": {"external_sku": "294.896.03", "product_url": "https://shop.example/hyltarp"},
+    "category": {"main": "Seating", "sub": "Sofas", "style": ["Scandinavian"]},
+    "pricing": {"currency": "EUR", "price": 838},
+}
+
+
+def scraped(sku, price, **fields):
+    return {"sku": sku, "name": "Sofa", "price": price, "currency": "EUR",
+            "source_url": "https://shop.example/sofas", **fields}
+
+
+def write(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(records))
+
+
+def run(tmp_path, **options):
+    build, changed = ingest.ingest(tmp_path / "catalog.sqlite", ["sofas"], tmp_path / "curated", tmp_path / "raw",
+                                   **options)
+    return build.counts, changed
+
+
+def records(tmp_path):
+    with closing(sqlite3.connect(str(tmp_path / "catalog.sqlite"))) as db:
+        return {product_id: json.loads(record) for product_id, record in db.execute("SELECT product_id, record FROM products")}
+
+
+def test_scraped_view_turns_placeholders_into_none():
+    view = ingest.scraped_view(scraped("1", 0.0, name="N/A", product_link="Link not found",
+                                       color_hint="Unknown", image_url="/img/1.jpg"))
+    assert view["name"] is None
+    assert view["product_link"] is None
+    assert view["color_hint"] is None
+    assert view["price"] is None
+    assert view["image_url"] == "https://shop.example/img/1.jpg"
+    assert ingest.scraped_view(scraped("1", "n/a"))["price"] is None
+
+
+def test_placeholders_never_overwrite_curated_data(tmp_path):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 0.0, product_link="Link not found")])
+    run(tmp_path)
+
+    record = records(tmp_path)["AP-SB-HYLTARP-29489603"]
+    assert record["pricing"]["price"] == 838
+    assert record["website_details"]["product_url"] == "https://shop.example/hyltarp"
+
+
+def test_scrape_updates_the_curated_product_with_the_same_sku(tmp_path):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 799.0, product_link="https://shop.example/p/1")])
+    counts, changed = run(tmp_path)
+
+    assert changed
+    assert counts["added"] == 1
+    record = records(tmp_path)["AP-SB-HYLTARP-29489603"]
+    assert record["pricing"]["price"] == 799.0
+    assert record["website_details"]["product_url"] == "https://shop.example/p/1"
+    assert record["category"]["style"] == ["Scandinavian"]
+
+
+def test_new_sku_without_price_is_skipped(tmp_path):
+    write(tmp_path / "raw" / "sofas.json", [scraped("111", 0.0), scraped("222", 450.0)])
+    counts, _ = run(tmp_path)
+
+    assert counts["skipped"] == 1
+    assert [record["pricing"]["price"] for record in records(tmp_path).values()] == [450.0]
+
+
+def test_rerun_without_changes_skips_every_file(tmp_path):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 799.0)])
+    run(tmp_path)
+
+    counts, changed = run(tmp_path)
+    assert not changed
+    assert counts["files_skipped"] == 2
+    assert counts["added"] == counts["updated"] == 0
+
+
+def test_rerun_updates_only_changed_rows(tmp_path):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 799.0), scraped("222", 450.0)])
+    run(tmp_path)
+
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 749.0), scraped("222", 450.0)])
+    counts, changed = run(tmp_path)
+    assert changed
+    assert counts["updated"] == 1
+    assert counts["added"] == 0
+    assert counts["files_skipped"] == 1
+    assert records(tmp_path)["AP-SB-HYLTARP-29489603"]["pricing"]["price"] == 749.0
+
+
+def test_product_dropped_from_every_input_is_removed(tmp_path):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    run(tmp_path)
+
+    write(tmp_path / "curated" / "sofas.json", [])
+    counts, changed = run(tmp_path)
+    assert changed
+    assert counts["removed"] == 1
+    assert records(tmp_path) == {}
+
+
+def test_rules_version_bump_reprocesses_unchanged_files(tmp_path, monkeypatch):
+    write(tmp_path / "curated" / "sofas.json", [CURATED_SOFA])
+    write(tmp_path / "raw" / "sofas.json", [scraped("29489603", 799.0)])
+    run(tmp_path)
+
+    monkeypatch.setattr(ingest, "RULES_VERSION", ingest.RULES_VERSION + 1)
+    counts, changed = run(tmp_path)
+    assert counts["files_skipped"] == 0
+    # Same inputs under the new rules: nothing to write
+    assert not changed
+
+    counts, _ = run(tmp_path)
+    assert counts["files_skipped"] == 2